@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmark - query throughput by thread count
+Usage: python benchmark.py [--queries 400] [--threads 1,2,4,8] [--repeat 3] [--json]
+       python benchmark.py --design-systems 48 [--workers 4] [--repeat 3] [--json]
+
+Runs core.search_batch over a fixed mix of domain and stack queries at each
+thread count and reports queries/second and speedup over one thread. On a
+GIL build the speedup stays near 1x; on a free-threaded build (e.g.
+python3.14t) it should grow with the number of cores.
+
+--design-systems compares design_pool modes (serial, processes and, on
+Python 3.14+, subinterpreters) on a batch of generations, reporting pool
+startup (including index warm-up) separately from throughput.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import design_pool
+from core import search_batch
+from design_system import generate_design_system
+
+QUERY_MIX = [
+    {"query": "glassmorphism dark mode", "domain": "style"},
+    {"query": "fintech crypto dashboard", "domain": "product"},
+    {"query": "animation accessibility focus", "domain": "ux"},
+    {"query": "elegant luxury serif", "domain": "typography"},
+    {"query": "saas pricing trust", "domain": "landing"},
+    {"query": "healthcare calm blue", "domain": "color"},
+    {"query": "trend over time comparison", "domain": "chart"},
+    {"query": "suspense waterfall bundle", "domain": "react"},
+    {"query": "form input label aria", "domain": "web"},
+    {"query": "image optimization lazy loading", "stack": "nextjs"},
+    {"query": "responsive layout grid", "stack": "html-tailwind"},
+    {"query": "form validation state", "stack": "react,vue,svelte"},
+]
+
+
+DESIGN_MIX = [
+    ("SaaS dashboard analytics", "Metrics"),
+    ("beauty spa wellness service", "Serenity Spa"),
+    ("e-commerce luxury", None),
+    ("portfolio creative agency", "Studio"),
+    ("fintech crypto exchange", None),
+    ("healthcare clinic booking", "CareFirst"),
+]
+
+
+def gil_enabled():
+    """False only on a free-threaded interpreter running without the GIL"""
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def run(n_queries, thread_counts, repeat):
+    """Best-of-repeat throughput for each thread count"""
+    requests = [QUERY_MIX[i % len(QUERY_MIX)] for i in range(n_queries)]
+    search_batch(QUERY_MIX, max_workers=1)  # build and warm every index first
+
+    rows = []
+    for threads in thread_counts:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search_batch(requests, max_workers=threads)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({"threads": threads, "seconds": round(best, 4), "qps": round(n_queries / best, 1)})
+    for row in rows:
+        row["speedup"] = round(row["qps"] / rows[0]["qps"], 2)
+    return rows
+
+
+def run_design(n_jobs, workers, repeat):
+    """Best-of-repeat design-system throughput per design_pool mode"""
+    jobs = [DESIGN_MIX[i % len(DESIGN_MIX)] for i in range(n_jobs)]
+    modes = ["serial", "processes"] + (["interpreters"] if design_pool.InterpreterPoolExecutor else [])
+
+    rows = []
+    for mode in modes:
+        start = time.perf_counter()
+        if mode == "serial":
+            generate_design_system(*jobs[0])
+        else:
+            # Pool startup and index warm-up; "interpreters" may fall back to processes
+            _, mode = design_pool.get_pool(mode, workers)
+            design_pool.generate_many(jobs[:workers], mode=mode, max_workers=workers)
+        startup = time.perf_counter() - start
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if mode == "serial":
+                for job in jobs:
+                    generate_design_system(*job)
+            else:
+                design_pool.generate_many(jobs, mode=mode, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({"mode": mode, "startup": round(startup, 4), "seconds": round(best, 4),
+                     "per_second": round(n_jobs / best, 1)})
+    design_pool.shutdown_pools()
+    for row in rows:
+        row["speedup"] = round(row["per_second"] / rows[0]["per_second"], 2)
+    return rows
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    default_threads = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))) or [1]
+
+    parser = argparse.ArgumentParser(description="UI Pro Max search throughput benchmark")
+    parser.add_argument("--queries", "-q", type=int, default=400, help="Queries per batch (default: 400)")
+    parser.add_argument("--threads", "-t", type=str, default=",".join(map(str, default_threads)),
+                        help="Comma-separated thread counts (default: powers of two up to the CPU count)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Runs per thread count; the best is kept")
+    parser.add_argument("--design-systems", "-ds", type=int, default=None, metavar="N",
+                        help="Benchmark N design-system generations per pool mode instead of queries")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Pool size for --design-systems (default: CPUs)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    info = {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "gil": gil_enabled(),
+        "cpus": cpus,
+    }
+
+    if args.design_systems:
+        workers = args.workers or cpus
+        rows = run_design(args.design_systems, workers, args.repeat)
+        info.update(design_systems=args.design_systems, workers=workers)
+    else:
+        thread_counts = [int(t) for t in args.threads.split(",") if t.strip()]
+        rows = run(args.queries, thread_counts, args.repeat)
+        info["queries"] = args.queries
+
+    if args.json:
+        print(json.dumps({**info, "results": rows}, indent=2))
+    elif args.design_systems:
+        print(f"## UI Pro Max Design-System Pool Benchmark")
+        print(f"**Python:** {info['python']} | **CPUs:** {cpus} | **Workers:** {workers} | "
+              f"**Generations/batch:** {args.design_systems}")
+        print("")
+        print("| Mode | Startup (s) | Seconds | Generations/s | Speedup |")
+        print("|------|-------------|---------|---------------|---------|")
+        for row in rows:
+            print(f"| {row['mode']} | {row['startup']} | {row['seconds']} | {row['per_second']} | {row['speedup']}x |")
+    else:
+        print(f"## UI Pro Max Benchmark")
+        print(f"**Python:** {info['python']} | **GIL:** {'enabled' if info['gil'] else 'disabled'} | "
+              f"**CPUs:** {cpus} | **Queries/batch:** {args.queries}")
+        print("")
+        print("| Threads | Seconds | Queries/s | Speedup |")
+        print("|---------|---------|-----------|---------|")
+        for row in rows:
+            print(f"| {row['threads']} | {row['seconds']} | {row['qps']} | {row['speedup']}x |")
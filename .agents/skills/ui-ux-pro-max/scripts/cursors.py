@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Cursors - opaque page cursors over cached ranked lists
+
+A paginated search ranks the corpus once and keeps the full list of matching
+row ids in a small bounded cache: in memory, and under the user cache
+directory (see index_cache.py) so separate `search.py --cursor` runs share it.
+A cursor encodes the original request plus an offset, so fetching a page is
+a list slice; if the list was evicted or the data changed, the request is
+simply ranked again.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import index_cache
+
+# ============ CONFIGURATION ============
+CURSOR_CACHE_SIZE = 32  # ranked lists kept in memory and on disk
+CURSOR_VERSION = 1
+
+_rankings = OrderedDict()  # ranking key -> list of row ids
+_lock = threading.Lock()
+
+
+# ============ RANKED LIST CACHE ============
+def ranking_key(*parts):
+    """Stable key for a ranked list (index sources/signature, query, filters, ...)"""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _ranking_dir():
+    return index_cache.cache_dir() / "rankings"
+
+
+def load_ranking(key):
+    """Return a cached ranked id list, or None"""
+    with _lock:
+        if key in _rankings:
+            _rankings.move_to_end(key)
+            return _rankings[key]
+    if not index_cache.INDEX_CACHE_ENABLED:
+        return None
+    try:
+        with open(_ranking_dir() / f"{key}.json", "r", encoding="utf-8") as f:
+            ids = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _remember(key, ids)
+    return ids
+
+
+def _remember(key, ids):
+    with _lock:
+        _rankings[key] = ids
+        _rankings.move_to_end(key)
+        while len(_rankings) > CURSOR_CACHE_SIZE:
+            _rankings.popitem(last=False)
+
+
+def store_ranking(key, ids):
+    """Cache a ranked id list, evicting the least recently used ones"""
+    _remember(key, ids)
+    if not index_cache.INDEX_CACHE_ENABLED:
+        return
+    directory = _ranking_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+        os.replace(tmp, directory / f"{key}.json")
+        files = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files[:-CURSOR_CACHE_SIZE]:
+            path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+# ============ CURSOR TOKENS ============
+# Fields search_page reads per request kind: (accepted types, required)
+_COMMON_FIELDS = {
+    "query": (str, True),
+    "max_results": (int, True),
+    "engine": (str, False),
+    "where": (dict, False),
+    "snippet_chars": (int, False),
+}
+_REQUEST_FIELDS = {
+    "search": {**_COMMON_FIELDS, "domain": (str, False)},
+    "stack": {**_COMMON_FIELDS, "stack": ((str, list), True), "per_stack": (int, False)},
+}
+
+
+def encode_cursor(request, offset):
+    """Opaque, URL-safe token for the page of request starting at offset"""
+    payload = json.dumps({"v": CURSOR_VERSION, "r": request, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (request, offset) for a token; raises ValueError if it is not a valid cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        if payload["v"] != CURSOR_VERSION:
+            raise ValueError("cursor version mismatch")
+        request, offset = payload["r"], int(payload["o"])
+        _check_request(request, offset)
+        return request, offset
+    except (ValueError, KeyError, TypeError, AttributeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def _check_request(request, offset):
+    """Raise ValueError unless a decoded request has the fields search_page reads, with their types"""
+    if not isinstance(request, dict):
+        raise ValueError("request is not an object")
+    kind = request.get("kind", "search")
+    if kind not in _REQUEST_FIELDS:
+        raise ValueError(f"unknown request kind {kind!r}")
+    for field, (types, required) in _REQUEST_FIELDS[kind].items():
+        if field not in request or request[field] is None:
+            if required:
+                raise ValueError(f"request without {field}")
+        elif not isinstance(request[field], types) or isinstance(request[field], bool):
+            raise ValueError(f"bad {field} in request")
+    if request["max_results"] < 1 or offset < 0:
+        raise ValueError("bad page bounds")
+    # Nested values are read by _normalize_where and _resolve_stacks without further checks
+    for values in (request.get("where") or {}).values():
+        if not isinstance(values, str) and not (isinstance(values, list)
+                                                and all(isinstance(value, str) for value in values)):
+            raise ValueError("bad where in request")
+    if isinstance(request.get("stack"), list) and not all(isinstance(stack, str) for stack in request["stack"]):
+        raise ValueError("bad stack in request")
@@ -11,85 +11,417 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+
+    # Machine consumers: the versioned dict itself, or --format json / msgpack
+    document = get_design_system("SaaS dashboard", "My Project")
+
+    # Precomputed per-category table (python design_system.py --build-materialized)
+    build_materialized()
+    result = generate_design_system("SaaS dashboard", "My Project", materialized=True)
 """
 
 import csv
+import hashlib
 import json
 import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+import index_cache
+from core import BM25, SearchContext, CSV_CONFIG, DATA_DIR
+from templates import Template
+
+try:
+    import msgpack
+except ImportError:  # optional, only for --format msgpack
+    msgpack = None
+from token_budget import estimate_tokens
 
 
 # ============ CONFIGURATION ============
 REASONING_FILE = "ui-reasoning.csv"
 
+# Optional domains fall back to defaults when a deadline_ms leaves no time to finish them
 SEARCH_CONFIG = {
-    "product": {"max_results": 1},
-    "style": {"max_results": 3},
-    "color": {"max_results": 2},
-    "landing": {"max_results": 2},
-    "typography": {"max_results": 2}
+    "product": {"max_results": 1, "optional": False},
+    "style": {"max_results": 3, "optional": True},
+    "color": {"max_results": 2, "optional": True},
+    "landing": {"max_results": 2, "optional": True},
+    "typography": {"max_results": 2, "optional": True}
 }
 
 
+# Optional fields blanked, least valuable first, until output fits a token_budget
+BUDGET_DROP_ORDER = [
+    ("typography", "css_import"),
+    ("typography", "google_fonts_url"),
+    ("typography", "best_for"),
+    ("style", "best_for"),
+    ("colors", "notes"),
+    ("pattern", "color_strategy"),
+    ("style", "keywords"),
+    ("pattern", "conversion"),
+    ("typography", "mood"),
+    (None, "anti_patterns"),
+    (None, "key_effects"),
+]
+
+# Query phrases signalling a Decision_Rules feature (the if_<feature> keys) besides the
+# feature's own name; every word of a phrase must occur in the query
+FEATURE_TERMS = {
+    "data_heavy": ["data", "analytics", "dashboard", "metrics", "reporting"],
+    "large_dataset": ["big data", "data table", "data grid"],
+    "ux_focused": ["usability", "user experience"],
+    "luxury": ["premium", "high end", "upscale"],
+    "conversion_focused": ["conversion", "sales", "signup"],
+    "real_time": ["realtime", "live", "streaming"],
+    "checkout": ["cart", "payment"],
+    "children": ["kids", "child"],
+    "health": ["healthcare", "wellness", "medical"],
+    "booking": ["appointment", "reservation"],
+    "collaboration": ["collaborative", "teamwork"],
+}
+GENERIC_FEATURE_WORDS = {"focused", "available", "needed", "ready"}
+
+# (domain, max_results) searched for every page override
+OVERRIDE_SEARCHES = [("style", 1), ("ux", 3), ("landing", 1)]
+PAGE_WRITE_WORKERS = 8
+# Header lines ignored when deciding whether a persisted file changed
+VOLATILE_LINE = re.compile(r"^(?:> )?\*\*Generated:\*\*.*$", re.MULTILINE)
+
+# Machine-readable output: bump SCHEMA_VERSION when a field is renamed, removed or retyped
+OUTPUT_FORMATS = ["ascii", "markdown", "json", "msgpack"]
+SCHEMA_NAME = "ui-ux-pro-max/design-system"
+SCHEMA_VERSION = 1
+DOCUMENT_ONLY_KEYS = {"schema", "schema_version", "query"}
+
+# Opt-in: serve generate() from the per-category table built by build_materialized()
+# (category-level style/color/typography/landing picks instead of query-specific ones)
+MATERIALIZED_ENABLED = False
+# Bump whenever generate() output changes so stale tables are rebuilt
+MATERIALIZED_VERSION = 1
+
+
+# ============ DECISION RULES ============
+_tokenize = BM25().tokenize  # the words search() ranks on
+_FEATURE_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _feature_words(text: str) -> tuple:
+    """Lowercased words of text with a plural s dropped, so dashboards matches dashboard."""
+    return tuple(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+                 for w in _FEATURE_WORD.findall(text.lower()))
+
+
+class DecisionRules:
+    """A rule's Decision_Rules JSON parsed once into (feature, action) clauses."""
+
+    def __init__(self, raw: str):
+        try:
+            parsed = json.loads(raw or "{}")
+        except json.JSONDecodeError:
+            parsed = {}
+        self.raw = parsed if isinstance(parsed, dict) else {}
+        # feature None = unconditional (must_have); if_<feature> applies when the query has it
+        self.clauses = [(key[3:] if key.startswith("if_") else None, action) for key, action in self.raw.items()]
+        self.features = {feature for feature, _ in self.clauses if feature}
+
+    def evaluate(self, features: set) -> list:
+        """Actions that apply to a query with these features, in rule order."""
+        return [action for feature, action in self.clauses if feature is None or feature in features]
+
+
+class FeatureExtractor:
+    """Detects decision-rule features in a query with one pass over its words."""
+
+    def __init__(self, features):
+        self.by_word = {}  # first word of a term -> [(feature, term words)]
+        for feature in sorted(features):
+            own = tuple(w for w in _feature_words(feature.replace("_", " ")) if w not in GENERIC_FEATURE_WORDS)
+            for term in [own] + [_feature_words(phrase) for phrase in FEATURE_TERMS.get(feature, [])]:
+                if term:
+                    self.by_word.setdefault(term[0], []).append((feature, term))
+
+    def extract(self, query: str) -> set:
+        words = set(_feature_words(query))
+        found = set()
+        for word in words:
+            for feature, term in self.by_word.get(word, ()):
+                if feature not in found and all(w in words for w in term[1:]):
+                    found.add(feature)
+        return found
+
+
+# ============ REASONING RULE INDEX ============
+def _build_automaton(patterns: dict) -> tuple:
+    """Aho-Corasick automaton over patterns (string -> rule index); see _first_within."""
+    goto, best = [{}], [None]
+    for pattern, idx in patterns.items():
+        state = 0
+        for ch in pattern:
+            if ch not in goto[state]:
+                goto.append({})
+                best.append(None)
+                goto[state][ch] = len(goto) - 1
+            state = goto[state][ch]
+        best[state] = idx if best[state] is None else min(best[state], idx)
+
+    # Breadth-first failure links; each state also inherits the best rule of its suffixes
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, child in goto[state].items():
+            link = fail[state]
+            while link and ch not in goto[link]:
+                link = fail[link]
+            fail[child] = goto[link][ch] if ch in goto[link] and goto[link][ch] != child else 0
+            inherited = best[fail[child]]
+            if inherited is not None and (best[child] is None or inherited < best[child]):
+                best[child] = inherited
+            queue.append(child)
+    return goto, fail, best
+
+
+def _first_within(text: str, automaton: tuple):
+    """Smallest rule index among the automaton's patterns occurring in text, in one pass."""
+    goto, fail, best = automaton
+    state, found = 0, best[0]
+    for ch in text:
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        if best[state] is not None and (found is None or best[state] < found):
+            found = best[state]
+    return found
+
+
+class ReasoningIndex:
+    """Lookup tables resolving a category to its reasoning rule without scanning every rule.
+
+    Precedence matches a linear scan: exact UI_Category match, then the first rule whose
+    category contains or is contained in the query, then the first rule sharing a keyword.
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self.categories = [rule.get("UI_Category", "").lower() for rule in rules]
+        self.exact = {}        # UI_Category (lowercased) -> first rule index
+        keywords = {}          # UI_Category keyword -> first rule index having it
+        for idx, ui_cat in enumerate(self.categories):
+            self.exact.setdefault(ui_cat, idx)
+            for keyword in ui_cat.replace("/", " ").replace("-", " ").split():
+                keywords.setdefault(keyword, idx)
+        self.category_matcher = _build_automaton(self.exact)
+        self.keyword_matcher = _build_automaton(keywords)
+        self._resolved = {}    # query category (lowercased) -> rule index or None
+
+    def _resolve(self, category_lower: str):
+        if category_lower in self.exact:
+            return self.exact[category_lower]
+
+        # A rule category inside the query, or the query inside a rule category (scanned once
+        # per distinct query: index_of memoizes the answer)
+        containing = next((idx for idx, ui_cat in enumerate(self.categories) if category_lower in ui_cat), None)
+        partial = [idx for idx in (_first_within(category_lower, self.category_matcher), containing)
+                   if idx is not None]
+        if partial:
+            return min(partial)
+
+        return _first_within(category_lower, self.keyword_matcher)
+
+    def index_of(self, category: str):
+        """Position of the rule for a category, or None if none matches"""
+        category_lower = category.lower()
+        if category_lower not in self._resolved:
+            self._resolved[category_lower] = self._resolve(category_lower)
+        return self._resolved[category_lower]
+
+    def find(self, category: str) -> dict:
+        """Rule for a category, or {} if none matches"""
+        idx = self.index_of(category)
+        return {} if idx is None else self.rules[idx]
+
+
+def _load_reasoning() -> list:
+    """Load reasoning rules from CSV."""
+    filepath = DATA_DIR / REASONING_FILE
+    if not filepath.exists():
+        return []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+_reasoning = {}  # ui-reasoning.csv signature -> (rules, ReasoningIndex, DecisionRules list, FeatureExtractor)
+_reasoning_lock = threading.Lock()
+
+
+def get_reasoning() -> tuple:
+    """Reasoning rules with their lookup structures, built once per ui-reasoning.csv version
+
+    Read-only after construction, so every generator (and thread) shares them.
+    """
+    filepath = DATA_DIR / REASONING_FILE
+    try:
+        stat = filepath.stat()
+        key = (str(filepath), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = (str(filepath), None)
+    state = _reasoning.get(key)
+    if state is None:
+        with _reasoning_lock:
+            # Another thread may have built it while this one waited
+            state = _reasoning.get(key)
+            if state is None:
+                rules = _load_reasoning()
+                decision_rules = [DecisionRules(rule.get("Decision_Rules")) for rule in rules]
+                features = set().union(*(decisions.features for decisions in decision_rules))
+                state = (rules, ReasoningIndex(rules), decision_rules, FeatureExtractor(features))
+                _reasoning.clear()
+                _reasoning[key] = state
+    return state
+
+
+# ============ STYLE MATCHING ============
+class StyleMatcher:
+    """Precomputed views of the style dataset for _select_best_match
+
+    Each style row keeps its lowercased name, keywords and whole-row text (the lowercased
+    str() of the row as search() returns it), and each priority keyword is scored against
+    every row once, the first time it is seen. Selection is then table lookups; results
+    that differ from the indexed rows are matched on the fly, the same way.
+    """
+
+    def __init__(self, rows: list, output_cols: list):
+        self.rows = {}    # Style Category -> row as search() returns it
+        self.views = {}   # Style Category -> (name, keywords, text) lowercased
+        for row in rows:
+            output_row = {col: row[col] for col in output_cols if col in row}
+            self.rows[output_row.get("Style Category", "")] = output_row
+            self.views[output_row.get("Style Category", "")] = self._view(output_row)
+        self.tables = {}  # keyword -> (name-matching categories, category -> score)
+
+    @staticmethod
+    def _view(result: dict) -> tuple:
+        return (result.get("Style Category", "").lower(), result.get("Keywords", "").lower(),
+                str(result).lower())
+
+    @staticmethod
+    def _name_match(kw: str, view: tuple) -> bool:
+        return kw in view[0] or view[0] in kw
+
+    @staticmethod
+    def _score(kw: str, view: tuple) -> int:
+        # Higher score for style name match, lower for keyword field, lowest for any other field
+        return 10 if kw in view[0] else 3 if kw in view[1] else 1 if kw in view[2] else 0
+
+    def _table(self, kw: str) -> tuple:
+        table = self.tables.get(kw)
+        if table is None:
+            table = self.tables[kw] = (
+                {cat for cat, view in self.views.items() if self._name_match(kw, view)},
+                {cat: self._score(kw, view) for cat, view in self.views.items()})
+        return table
+
+    def select(self, results: list, priority_keywords: list) -> dict:
+        """Same choice as a linear scan: first name match by priority, else best score (ties: first)."""
+        # (category, None) for indexed rows, (None, fresh view) for anything else
+        keys = [(category, None) if self.rows.get(category) == result else (None, self._view(result))
+                for result, category in ((result, result.get("Style Category", "")) for result in results)]
+        tables = [(kw, self._table(kw)) for kw in (kw.lower().strip() for kw in priority_keywords)]
+
+        # First: try exact style name match
+        for kw, (hits, _) in tables:
+            for result, (category, view) in zip(results, keys):
+                if category in hits if view is None else self._name_match(kw, view):
+                    return result
+
+        # Second: score by keyword match in all fields
+        best, best_score = results[0], 0
+        for result, (category, view) in zip(results, keys):
+            score = sum(scores[category] if view is None else self._score(kw, view)
+                        for kw, (_, scores) in tables)
+            if score > best_score:
+                best, best_score = result, score
+        return best
+
+
+_style_matchers = {}  # styles file signature -> StyleMatcher
+_style_matchers_lock = threading.Lock()
+
+
+def get_style_matcher() -> StyleMatcher:
+    """StyleMatcher for the current styles file, built once per data version"""
+    config = CSV_CONFIG["style"]
+    path = DATA_DIR / config["file"]
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    matcher = _style_matchers.get(key)
+    if matcher is None:
+        with _style_matchers_lock:
+            # Another thread may have built it while this one waited
+            matcher = _style_matchers.get(key)
+            if matcher is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+                matcher = StyleMatcher(rows, config["output_cols"])
+                _style_matchers.clear()
+                _style_matchers[key] = matcher
+    return matcher
+
+
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
     def __init__(self):
-        self.reasoning_data = self._load_reasoning()
+        (self.reasoning_data, self.reasoning_index, self.decision_rules,
+         self.feature_extractor) = get_reasoning()
+        self.style_matcher = get_style_matcher()
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+        return _load_reasoning()
+
+    def _multi_domain_search(self, query: str, style_priority: list = None, deadline: float = None,
+                             done: dict = None, context: SearchContext = None) -> dict:
+        """Execute searches across multiple domains (already searched ones in done are reused)."""
+        context = context or SearchContext()
+        results = dict(done or {})
         for domain, config in SEARCH_CONFIG.items():
+            if domain in results:
+                continue
+            search_query = query
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
-            else:
-                results[domain] = search(query, domain, config["max_results"])
+                search_query = f"{query} {priority_query}"
+
+            if deadline is None or not config["optional"]:
+                results[domain] = context.search(search_query, domain, config["max_results"])
+                continue
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            result = {"partial": True}
+            if remaining_ms > 0:
+                result = context.search(search_query, domain, config["max_results"], deadline_ms=remaining_ms)
+            # An unfinished optional domain is skipped rather than trusted half-scored
+            results[domain] = {"results": [], "skipped": True} if result.get("partial") else result
         return results
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+        return self.reasoning_index.find(category)
 
-        return {}
+    def _apply_reasoning(self, category: str, search_results: dict, features: set = None) -> dict:
+        """Apply reasoning rules to search results (decision rules evaluated against query features)."""
+        idx = self.reasoning_index.index_of(category)
 
-    def _apply_reasoning(self, category: str, search_results: dict) -> dict:
-        """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
-
-        if not rule:
+        if idx is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -98,16 +430,12 @@ class DesignSystemGenerator:
                 "key_effects": "Subtle hover transitions",
                 "anti_patterns": "",
                 "decision_rules": {},
+                "applied_rules": [],
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        rule = self.reasoning_data[idx]
+        decision_rules = self.decision_rules[idx]
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
             "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
@@ -115,7 +443,8 @@ class DesignSystemGenerator:
             "typography_mood": rule.get("Typography_Mood", ""),
             "key_effects": rule.get("Key_Effects", ""),
             "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
+            "decision_rules": dict(decision_rules.raw),
+            "applied_rules": decision_rules.evaluate(features or set()),
             "severity": rule.get("Severity", "MEDIUM")
         }
 
@@ -127,55 +456,60 @@ class DesignSystemGenerator:
         if not priority_keywords:
             return results[0]
 
-        # First: try exact style name match
-        for priority in priority_keywords:
-            priority_lower = priority.lower().strip()
-            for result in results:
-                style_name = result.get("Style Category", "").lower()
-                if priority_lower in style_name or style_name in priority_lower:
-                    return result
-
-        # Second: score by keyword match in all fields
-        scored = []
-        for result in results:
-            result_str = str(result).lower()
-            score = 0
-            for kw in priority_keywords:
-                kw_lower = kw.lower().strip()
-                # Higher score for style name match
-                if kw_lower in result.get("Style Category", "").lower():
-                    score += 10
-                # Lower score for keyword field match
-                elif kw_lower in result.get("Keywords", "").lower():
-                    score += 3
-                # Even lower for other field matches
-                elif kw_lower in result_str:
-                    score += 1
-            scored.append((score, result))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0][1] if scored and scored[0][0] > 0 else results[0]
+        return self.style_matcher.select(results, priority_keywords)
 
     def _extract_results(self, search_result: dict) -> list:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
-    def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
+    def generate(self, query: str, project_name: str = None, deadline_ms: float = None,
+                 materialized: bool = None, context: SearchContext = None) -> dict:
+        """Generate complete design system recommendation (optional domains only within deadline_ms).
+
+        With materialized (default MATERIALIZED_ENABLED) and a built table, a known category is
+        served from the table and only the query-specific fields are recomputed. Searches run
+        through context, so a caller that passes it on (e.g. to persist_design_system) reuses them.
+        """
+        deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000
+        context = context or SearchContext()
+
         # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        product_result = context.search(query, "product", 1)
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
-        # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        if MATERIALIZED_ENABLED if materialized is None else materialized:
+            table = load_materialized()
+            if table and category in table:
+                return self._from_materialized(table[category], query, project_name, category, deadline)
+
+        return self._compose(query, project_name, category, product_result, deadline, context)
+
+    def _from_materialized(self, entry: dict, query: str, project_name: str, category: str,
+                           deadline: float = None) -> dict:
+        """A precomputed category design system plus the fields that depend on the query."""
+        design_system = json.loads(json.dumps(entry))
+        design_system["project_name"] = project_name or query.upper()
+        idx = self.reasoning_index.index_of(category)
+        if idx is not None:
+            features = self.feature_extractor.extract(query)
+            design_system["applied_rules"] = self.decision_rules[idx].evaluate(features)
+        if deadline is not None:
+            design_system.update(partial=False, completed=1.0, skipped_domains=[])
+        return design_system
+
+    def _compose(self, query: str, project_name: str, category: str, product_result: dict,
+                 deadline: float = None, context: SearchContext = None) -> dict:
+        """Steps 2-5 of generate: reasoning, domain searches and the final recommendation."""
+        # Step 2: Get reasoning rules for this category, decided by the query's features
+        reasoning = self._apply_reasoning(category, {}, self.feature_extractor.extract(query))
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        search_results = self._multi_domain_search(query, style_priority, deadline, {"product": product_result},
+                                                   context)
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -194,7 +528,7 @@ class DesignSystemGenerator:
         reasoning_effects = reasoning.get("key_effects", "")
         combined_effects = style_effects if style_effects else reasoning_effects
 
-        return {
+        design_system = {
             "project_name": project_name or query.upper(),
             "category": category,
             "pattern": {
@@ -232,15 +566,373 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
+            "applied_rules": reasoning.get("applied_rules", []),
             "severity": reasoning.get("severity", "MEDIUM")
         }
+        if deadline is not None:
+            skipped = [domain for domain, result in search_results.items() if result.get("skipped")]
+            design_system["partial"] = bool(skipped)
+            design_system["completed"] = round(1 - len(skipped) / len(SEARCH_CONFIG), 3)
+            design_system["skipped_domains"] = skipped
+        return design_system
 
 
-# ============ OUTPUT FORMATTERS ============
+# ============ MATERIALIZED DESIGN SYSTEMS ============
+_materialized = {}       # artifact name -> table, for this process
+_materialized_paths = {}  # data file (mtime, size) signature -> artifact path
+
+
+def _materialized_path() -> Path:
+    """Cache artifact for the current data files (keyed by their bytes)"""
+    files = [DATA_DIR / name for name in [REASONING_FILE] + [CSV_CONFIG[domain]["file"] for domain in SEARCH_CONFIG]]
+    files = [path for path in files if path.exists()]
+    signature = tuple((path.stat().st_mtime_ns, path.stat().st_size) for path in files)
+    if signature not in _materialized_paths:
+        raw = b"\0".join(path.read_bytes() for path in files)
+        key = index_cache.content_key(raw, "design-systems", MATERIALIZED_VERSION, sorted(SEARCH_CONFIG.items()))
+        _materialized_paths[signature] = index_cache.cache_dir() / "design-systems" / f"{key}.json"
+    return _materialized_paths[signature]
+
+
+def build_materialized() -> Path:
+    """Precompute the design system of every product category into a JSON table; returns its path"""
+    generator = DesignSystemGenerator()
+    table = {}
+    with open(DATA_DIR / CSV_CONFIG["product"]["file"], 'r', encoding='utf-8') as f:
+        products = list(csv.DictReader(f))
+    for row in products:
+        category = row.get("Product Type", "")
+        if category and category not in table:
+            # The category name is the query; project name and applied rules are per-query deltas
+            design_system = generator._compose(category, "", category, {"results": [row]})
+            design_system["applied_rules"] = []
+            table[category] = design_system
+
+    path = _materialized_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(table, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _materialized.clear()
+    return path
+
+
+def load_materialized() -> dict:
+    """The built table for the current data files, or None if build_materialized has not run"""
+    path = _materialized_path()
+    if path.name not in _materialized:
+        try:
+            _materialized[path.name] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+    return _materialized[path.name]
+
+
+# ============ TEMPLATES ============
 BOX_WIDTH = 90  # Wider box for more content
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
+
+def wrap_text(text: str, prefix: str, width: int) -> list:
+    """Wrap long text into multiple lines."""
+    if not text:
+        return []
+    lines = []
+    words = []              # words on the current line
+    length = len(prefix)    # length of prefix + " ".join(words)
+    for word in text.split():
+        if length + len(word) + 1 <= width - 2:
+            length += len(word) + (1 if words else 0)
+            words.append(word)
+        else:
+            if words:
+                lines.append(prefix + " ".join(words))
+            words = [word]
+            length = len(prefix) + len(word)
+    if words:
+        lines.append(prefix + " ".join(words))
+    return lines
+
+
+def _box(text: str) -> str:
+    """One ASCII box row: text padded to the box width and closed."""
+    return text.ljust(BOX_WIDTH) + "|"
+
+
+def _box_rows(rows: list) -> str:
+    """Rows for an optional block slot, each on its own line after the slot's line."""
+    return "".join(["\n" + row.ljust(BOX_WIDTH) + "|" for row in rows])
+
+
+# ${slot}s are filled by the formatters below; optional blocks are slots that render to ""
+_BOX_BORDER = "+" + "-" * (BOX_WIDTH - 1) + "+"
+_BOX_BLANK = "|" + " " * BOX_WIDTH + "|"
+
+ASCII_CHECKLIST = [
+    "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+    "[ ] cursor-pointer on all clickable elements",
+    "[ ] Hover states with smooth transitions (150-300ms)",
+    "[ ] Light mode: text contrast 4.5:1 minimum",
+    "[ ] Focus states visible for keyboard nav",
+    "[ ] prefers-reduced-motion respected",
+    "[ ] Responsive: 375px, 768px, 1024px, 1440px"
+]
+
+ASCII_TEMPLATE = Template("\n".join([
+    _BOX_BORDER,
+    "${title}",
+    _BOX_BORDER + "${partial}",
+    _BOX_BLANK,
+    "${pattern}",
+    _BOX_BLANK,
+    "${style}",
+    _BOX_BLANK,
+    _box("|  COLORS:") + "${colors}",
+    _BOX_BLANK,
+    "${typography}",
+    _BOX_BLANK + "${effects}${anti_patterns}",
+    _box("|  PRE-DELIVERY CHECKLIST:"),
+    *(_box(f"|     {item}") for item in ASCII_CHECKLIST),
+    _BOX_BLANK,
+    _BOX_BORDER,
+]))
+
+MARKDOWN_TEMPLATE = Template("""\
+## Design System: ${project}
+
+${partial}### Pattern
+- **Name:** ${pattern_name}
+${pattern_lines}- **Sections:** ${sections}
+
+### Style
+- **Name:** ${style_name}
+${style_lines}
+### Colors
+| Role | Hex |
+|------|-----|
+| Primary | ${primary} |
+| Secondary | ${secondary} |
+| CTA | ${cta} |
+| Background | ${background} |
+| Text | ${text} |
+${color_notes}
+### Typography
+- **Heading:** ${heading}
+- **Body:** ${body}
+${typography_lines}
+${effects}${anti_patterns}### Pre-Delivery Checklist
+- [ ] No emojis as icons (use SVG: Heroicons/Lucide)
+- [ ] cursor-pointer on all clickable elements
+- [ ] Hover states with smooth transitions (150-300ms)
+- [ ] Light mode: text contrast 4.5:1 minimum
+- [ ] Focus states visible for keyboard nav
+- [ ] prefers-reduced-motion respected
+- [ ] Responsive: 375px, 768px, 1024px, 1440px
+""")
+
+MASTER_TEMPLATE = Template("""\
+# Design System Master File
+
+> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.
+> If that file exists, its rules **override** this Master file.
+> If not, strictly follow the rules below.
+
+---
+
+**Project:** ${project}
+**Generated:** ${timestamp}
+**Category:** ${category}
+
+---
+
+## Global Rules
+
+### Color Palette
+
+| Role | Hex | CSS Variable |
+|------|-----|--------------|
+| Primary | `${primary}` | `--color-primary` |
+| Secondary | `${secondary}` | `--color-secondary` |
+| CTA/Accent | `${cta}` | `--color-cta` |
+| Background | `${background}` | `--color-background` |
+| Text | `${text}` | `--color-text` |
+
+${color_notes}### Typography
+
+- **Heading Font:** ${heading}
+- **Body Font:** ${body}
+${typography_lines}
+${css_import}### Spacing Variables
+
+| Token | Value | Usage |
+|-------|-------|-------|
+| `--space-xs` | `4px` / `0.25rem` | Tight gaps |
+| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |
+| `--space-md` | `16px` / `1rem` | Standard padding |
+| `--space-lg` | `24px` / `1.5rem` | Section padding |
+| `--space-xl` | `32px` / `2rem` | Large gaps |
+| `--space-2xl` | `48px` / `3rem` | Section margins |
+| `--space-3xl` | `64px` / `4rem` | Hero padding |
+
+### Shadow Depths
+
+| Level | Value | Usage |
+|-------|-------|-------|
+| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |
+| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |
+| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |
+| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |
+
+---
+
+## Component Specs
+
+### Buttons
+
+```css
+/* Primary Button */
+.btn-primary {
+  background: ${cta};
+  color: white;
+  padding: 12px 24px;
+  border-radius: 8px;
+  font-weight: 600;
+  transition: all 200ms ease;
+  cursor: pointer;
+}
+
+.btn-primary:hover {
+  opacity: 0.9;
+  transform: translateY(-1px);
+}
+
+/* Secondary Button */
+.btn-secondary {
+  background: transparent;
+  color: ${primary};
+  border: 2px solid ${primary};
+  padding: 12px 24px;
+  border-radius: 8px;
+  font-weight: 600;
+  transition: all 200ms ease;
+  cursor: pointer;
+}
+```
+
+### Cards
+
+```css
+.card {
+  background: ${card_background};
+  border-radius: 12px;
+  padding: 24px;
+  box-shadow: var(--shadow-md);
+  transition: all 200ms ease;
+  cursor: pointer;
+}
+
+.card:hover {
+  box-shadow: var(--shadow-lg);
+  transform: translateY(-2px);
+}
+```
+
+### Inputs
+
+```css
+.input {
+  padding: 12px 16px;
+  border: 1px solid #E2E8F0;
+  border-radius: 8px;
+  font-size: 16px;
+  transition: border-color 200ms ease;
+}
+
+.input:focus {
+  border-color: ${primary};
+  outline: none;
+  box-shadow: 0 0 0 3px ${primary}20;
+}
+```
+
+### Modals
+
+```css
+.modal-overlay {
+  background: rgba(0, 0, 0, 0.5);
+  backdrop-filter: blur(4px);
+}
+
+.modal {
+  background: white;
+  border-radius: 16px;
+  padding: 32px;
+  box-shadow: var(--shadow-xl);
+  max-width: 500px;
+  width: 90%;
+}
+```
+
+---
+
+## Style Guidelines
+
+**Style:** ${style_name}
+
+${style_lines}### Page Pattern
+
+**Pattern Name:** ${pattern_name}
+
+${pattern_lines}- **Section Order:** ${sections}
+
+---
+
+## Anti-Patterns (Do NOT Use)
+
+${anti_patterns}
+### Additional Forbidden Patterns
+
+- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)
+- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer
+- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout
+- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio
+- ❌ **Instant state changes** — Always use transitions (150-300ms)
+- ❌ **Invisible focus states** — Focus states must be visible for a11y
+
+---
+
+## Pre-Delivery Checklist
+
+Before delivering any UI code, verify:
+
+- [ ] No emojis used as icons (use SVG instead)
+- [ ] All icons from consistent icon set (Heroicons/Lucide)
+- [ ] `cursor-pointer` on all clickable elements
+- [ ] Hover states with smooth transitions (150-300ms)
+- [ ] Light mode: text contrast 4.5:1 minimum
+- [ ] Focus states visible for keyboard navigation
+- [ ] `prefers-reduced-motion` respected
+- [ ] Responsive: 375px, 768px, 1024px, 1440px
+- [ ] No content hidden behind fixed navbars
+- [ ] No horizontal scroll on mobile
+""")
+
+
+def _render(template: Template, values: dict, write=None):
+    """Render to a string, or stream to write (e.g. a file's write) and return None."""
+    if write is None:
+        return template.render(values)
+    template.stream(values, write)
+    return None
+
+
+# ============ OUTPUT FORMATTERS ============
+def format_ascii_box(design_system: dict, write=None) -> str:
+    """Format design system as ASCII box with emojis (MCP-style); streamed to write if given."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -249,123 +941,69 @@ def format_ascii_box(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
-
     # Build sections from pattern
-    sections = pattern.get("sections", "").split(">")
-    sections = [s.strip() for s in sections if s.strip()]
+    sections = [s.strip() for s in pattern.get("sections", "").split(">") if s.strip()]
 
-    # Build output lines
-    lines = []
-    w = BOX_WIDTH - 1
-
-    lines.append("+" + "-" * w + "+")
-    lines.append(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|")
-    lines.append("+" + "-" * w + "+")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Pattern section
-    lines.append(f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|")
-    if pattern.get('conversion'):
-        lines.append(f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|")
-    if pattern.get('cta_placement'):
-        lines.append(f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append("|     Sections:".ljust(BOX_WIDTH) + "|")
-    for i, section in enumerate(sections, 1):
-        lines.append(f"|       {i}. {section}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Style section
-    lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
+    pattern_rows = []
+    if pattern.get("conversion"):
+        pattern_rows.append(f"|     Conversion: {pattern['conversion']}")
+    if pattern.get("cta_placement"):
+        pattern_rows.append(f"|     CTA: {pattern['cta_placement']}")
+    pattern_rows.append("|     Sections:")
+    pattern_rows.extend(f"|       {i}. {section}" for i, section in enumerate(sections, 1))
+
+    style_rows = []
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        style_rows.extend(wrap_text(f"Keywords: {style['keywords']}", "|     ", BOX_WIDTH))
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        style_rows.extend(wrap_text(f"Best For: {style['best_for']}", "|     ", BOX_WIDTH))
     if style.get("performance") or style.get("accessibility"):
-        perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Colors section
-    lines.append("|  COLORS:".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
+        style_rows.append(f"|     Performance: {style.get('performance', '')} | "
+                          f"Accessibility: {style.get('accessibility', '')}")
+
+    color_rows = [
+        f"|     Primary:    {colors.get('primary', '')}",
+        f"|     Secondary:  {colors.get('secondary', '')}",
+        f"|     CTA:        {colors.get('cta', '')}",
+        f"|     Background: {colors.get('background', '')}",
+        f"|     Text:       {colors.get('text', '')}",
+    ]
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        color_rows.extend(wrap_text(f"Notes: {colors['notes']}", "|     ", BOX_WIDTH))
 
-    # Typography section
-    lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
+    typography_rows = []
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        typography_rows.extend(wrap_text(f"Mood: {typography['mood']}", "|     ", BOX_WIDTH))
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        typography_rows.extend(wrap_text(f"Best For: {typography['best_for']}", "|     ", BOX_WIDTH))
     if typography.get("google_fonts_url"):
-        lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
+        typography_rows.append(f"|     Google Fonts: {typography['google_fonts_url']}")
     if typography.get("css_import"):
-        lines.append(f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Key Effects section
-    if effects:
-        lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Anti-patterns section
-    if anti_patterns:
-        lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Pre-Delivery Checklist section
-    lines.append("|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|")
-    checklist_items = [
-        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
-        "[ ] cursor-pointer on all clickable elements",
-        "[ ] Hover states with smooth transitions (150-300ms)",
-        "[ ] Light mode: text contrast 4.5:1 minimum",
-        "[ ] Focus states visible for keyboard nav",
-        "[ ] prefers-reduced-motion respected",
-        "[ ] Responsive: 375px, 768px, 1024px, 1440px"
-    ]
-    for item in checklist_items:
-        lines.append(f"|     {item}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    lines.append("+" + "-" * w + "+")
-
-    return "\n".join(lines)
+        typography_rows.append(f"|     CSS Import: {typography['css_import'][:70]}...")
+
+    partial = ""
+    if design_system.get("partial"):
+        skipped = ", ".join(design_system.get("skipped_domains", []))
+        partial = _box_rows([f"|  PARTIAL: deadline reached, defaults used for {skipped}"])
+
+    values = {
+        "title": _box(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM"),
+        "partial": partial,
+        "pattern": _box(f"|  PATTERN: {pattern.get('name', '')}") + _box_rows(pattern_rows),
+        "style": _box(f"|  STYLE: {style.get('name', '')}") + _box_rows(style_rows),
+        "colors": _box_rows(color_rows),
+        "typography": _box(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}")
+                      + _box_rows(typography_rows),
+        "effects": _box_rows(["|  KEY EFFECTS:"] + wrap_text(effects, "|     ", BOX_WIDTH))
+                   + "\n" + _BOX_BLANK if effects else "",
+        "anti_patterns": _box_rows(["|  AVOID (Anti-patterns):"] + wrap_text(anti_patterns, "|     ", BOX_WIDTH))
+                         + "\n" + _BOX_BLANK if anti_patterns else "",
+    }
+    return _render(ASCII_TEMPLATE, values, write)
 
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+def format_markdown(design_system: dict, write=None) -> str:
+    """Format design system as markdown; streamed to write if given."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -374,129 +1012,185 @@ def format_markdown(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+    partial = ""
+    if design_system.get("partial"):
+        skipped = ", ".join(design_system.get("skipped_domains", []))
+        partial = f"> **Partial:** deadline reached, defaults used for {skipped}\n\n"
+
+    css_import = typography.get("css_import")
+    newline_bullet = '\n- '
+    values = {
+        "project": project,
+        "partial": partial,
+        "pattern_name": pattern.get("name", ""),
+        "pattern_lines": (f"- **Conversion Focus:** {pattern['conversion']}\n" if pattern.get("conversion") else "")
+                         + (f"- **CTA Placement:** {pattern['cta_placement']}\n" if pattern.get("cta_placement") else "")
+                         + (f"- **Color Strategy:** {pattern['color_strategy']}\n"
+                            if pattern.get("color_strategy") else ""),
+        "sections": pattern.get("sections", ""),
+        "style_name": style.get("name", ""),
+        "style_lines": (f"- **Keywords:** {style['keywords']}\n" if style.get("keywords") else "")
+                       + (f"- **Best For:** {style['best_for']}\n" if style.get("best_for") else "")
+                       + (f"- **Performance:** {style.get('performance', '')} | "
+                          f"**Accessibility:** {style.get('accessibility', '')}\n"
+                          if style.get("performance") or style.get("accessibility") else ""),
+        "primary": colors.get("primary", ""),
+        "secondary": colors.get("secondary", ""),
+        "cta": colors.get("cta", ""),
+        "background": colors.get("background", ""),
+        "text": colors.get("text", ""),
+        "color_notes": f"\n*Notes: {colors['notes']}*\n" if colors.get("notes") else "",
+        "heading": typography.get("heading", ""),
+        "body": typography.get("body", ""),
+        "typography_lines": (f"- **Mood:** {typography['mood']}\n" if typography.get("mood") else "")
+                            + (f"- **Best For:** {typography['best_for']}\n" if typography.get("best_for") else "")
+                            + (f"- **Google Fonts:** {typography['google_fonts_url']}\n"
+                               if typography.get("google_fonts_url") else "")
+                            + (f"- **CSS Import:**\n```css\n{css_import}\n```\n" if css_import else ""),
+        "effects": f"### Key Effects\n{effects}\n\n" if effects else "",
+        "anti_patterns": f"### Avoid (Anti-patterns)\n- {anti_patterns.replace(' + ', newline_bullet)}\n\n"
+                         if anti_patterns else "",
+    }
+    return _render(MARKDOWN_TEMPLATE, values, write)
 
-    # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
-    if pattern.get('conversion'):
-        lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
-    if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
-    if pattern.get('color_strategy'):
-        lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
-    lines.append(f"- **Sections:** {pattern.get('sections', '')}")
-    lines.append("")
 
-    # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
-    if style.get('keywords'):
-        lines.append(f"- **Keywords:** {style.get('keywords', '')}")
-    if style.get('best_for'):
-        lines.append(f"- **Best For:** {style.get('best_for', '')}")
-    if style.get('performance') or style.get('accessibility'):
-        lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
-    lines.append("")
+def fit_token_budget(design_system: dict, formatter, budget: int) -> str:
+    """Format design_system, blanking optional fields in BUDGET_DROP_ORDER until it fits budget tokens.
 
-    # Colors section
-    lines.append("### Colors")
-    lines.append(f"| Role | Hex |")
-    lines.append(f"|------|-----|")
-    lines.append(f"| Primary | {colors.get('primary', '')} |")
-    lines.append(f"| Secondary | {colors.get('secondary', '')} |")
-    lines.append(f"| CTA | {colors.get('cta', '')} |")
-    lines.append(f"| Background | {colors.get('background', '')} |")
-    lines.append(f"| Text | {colors.get('text', '')} |")
-    if colors.get("notes"):
-        lines.append(f"\n*Notes: {colors.get('notes', '')}*")
-    lines.append("")
+    The fixed sections may still exceed a small budget. JSON output then reports it in
+    token_budget, token_estimate and over_budget; text output gets a warning on stderr.
+    """
+    trimmed = {key: dict(value) if isinstance(value, dict) else value for key, value in design_system.items()}
+    output = formatter(trimmed)
+    for section, key in BUDGET_DROP_ORDER:
+        if estimate_tokens(output) <= budget:
+            break
+        target = trimmed if section is None else trimmed.get(section, {})
+        if target.get(key):
+            target[key] = ""
+            output = formatter(trimmed)
+
+    tokens = estimate_tokens(output)
+    if formatter is format_json:
+        # The estimate is of the output that carries it, so repeat until the figure is stable
+        for _ in range(3):
+            trimmed.update(token_budget=budget, token_estimate=tokens, over_budget=tokens > budget)
+            output = formatter(trimmed)
+            if estimate_tokens(output) == tokens:
+                break
+            tokens = estimate_tokens(output)
+    elif tokens > budget:
+        print(f"design_system: output is about {tokens} tokens, over the token budget of {budget} "
+              f"(only optional fields can be left out)", file=sys.stderr)
+    return output
+
+
+# ============ STRUCTURED OUTPUT ============
+def design_system_document(design_system: dict, query: str = None) -> dict:
+    """The generate() dict in the versioned schema served as json/msgpack
+
+    Every top-level key is always present (deadline fields default to a complete run),
+    so consumers can rely on the shape of a given schema_version.
+    """
+    return {
+        "schema": SCHEMA_NAME,
+        "schema_version": SCHEMA_VERSION,
+        "query": query,
+        **design_system,
+        "partial": bool(design_system.get("partial", False)),
+        "completed": design_system.get("completed", 1.0),
+        "skipped_domains": list(design_system.get("skipped_domains", [])),
+    }
 
-    # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
-    if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
-    if typography.get("best_for"):
-        lines.append(f"- **Best For:** {typography.get('best_for', '')}")
-    if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
-    if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
-    lines.append("")
 
-    # Key Effects section
-    if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
-
-    # Anti-patterns section
-    if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
-        newline_bullet = '\n- '
-        lines.append(f"- {anti_patterns.replace(' + ', newline_bullet)}")
-        lines.append("")
-
-    # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
+def format_json(document: dict) -> str:
+    """Serialize a design-system document as JSON."""
+    return json.dumps(document, indent=2, ensure_ascii=False)
 
-    return "\n".join(lines)
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("MessagePack output needs the msgpack package (pip install msgpack)")
+
+
+def format_msgpack(document: dict) -> bytes:
+    """Serialize a design-system document as MessagePack (needs the msgpack package)."""
+    _require_msgpack()
+    return msgpack.packb(document, use_bin_type=True)
 
 
 # ============ MAIN ENTRY POINT ============
+def get_design_system(query: str, project_name: str = None, persist: bool = False, page: str = None,
+                      output_dir: str = None, deadline_ms: float = None, materialized: bool = None) -> dict:
+    """
+    Design system as a versioned dict (see design_system_document), without any text rendering.
+
+    Arguments are those of generate_design_system.
+    """
+    generator = DesignSystemGenerator()
+    context = SearchContext()  # shared by the generation and its page overrides
+    design_system = generator.generate(query, project_name, deadline_ms, materialized, context)
+
+    # Persist to files if requested
+    if persist:
+        persist_design_system(design_system, page, output_dir, query, context)
+    return design_system_document(design_system, query)
+
+
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           deadline_ms: float = None, token_budget: int = None, materialized: bool = None):
     """
     Main entry point for design system generation.
 
     Args:
         query: Search query (e.g., "SaaS dashboard", "e-commerce luxury")
         project_name: Optional project name for output header
-        output_format: "ascii" (default) or "markdown"
+        output_format: "ascii" (default), "markdown", "json" or "msgpack" (see OUTPUT_FORMATS)
         persist: If True, save design system to design-system/ folder
-        page: Optional page name for page-specific override file
+        page: Optional page name(s) for page-specific override files (see persist_design_system)
         output_dir: Optional output directory (defaults to current working directory)
+        deadline_ms: Optional latency budget; optional domains that miss it use defaults
+        token_budget: Optional output size in tokens; low-value fields are left out to fit (text and json).
+            If the output still exceeds it, json says so in over_budget and text warns on stderr
+        materialized: Serve known categories from the build_materialized() table
+            (default: MATERIALIZED_ENABLED)
 
     Returns:
-        Formatted design system string
+        Formatted design system string (bytes for msgpack)
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
-    
-    # Persist to files if requested
-    if persist:
-        persist_design_system(design_system, page, output_dir, query)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}. Available: {', '.join(OUTPUT_FORMATS)}")
+    if output_format == "msgpack":
+        _require_msgpack()  # fail before generating
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+    document = get_design_system(query, project_name, persist, page, output_dir, deadline_ms, materialized)
+    if output_format == "msgpack":
+        return format_msgpack(document)
+
+    formatter = {"ascii": format_ascii_box, "markdown": format_markdown, "json": format_json}[output_format]
+    if output_format != "json":
+        # Text formatters read only the design-system fields
+        document = {key: value for key, value in document.items() if key not in DOCUMENT_ONLY_KEYS}
+    if token_budget:
+        return fit_token_budget(document, formatter, token_budget)
+    return formatter(document)
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def persist_design_system(design_system: dict, page=None, output_dir: str = None, page_query: str = None,
+                          context: SearchContext = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
     Args:
         design_system: The generated design system dictionary
-        page: Optional page name for page-specific override file
+        page: Optional page name(s) for page-specific override files: a name, a comma-separated
+            string or a list; globs (e.g. "*", "admin-*") match existing override files
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        context: Optional SearchContext of the request that generated design_system; page
+            override searches reuse its work
     
     Returns:
         dict with created file paths and status
@@ -520,296 +1214,143 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # Generate and write MASTER.md
     master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
+    writes = [(str(master_file), _write_if_changed(master_file, master_content))]
     
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+    # If pages are specified, create page override files with intelligent content
+    pages = expand_pages(page, pages_dir)
+    if pages:
+        writes.extend(_persist_pages(design_system, [(name, page_query) for name in pages], pages_dir, context))
+    created_files = [path for path, _ in writes]
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "written_files": [path for path, written in writes if written],
+        "unchanged_files": [path for path, written in writes if not written]
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
-    project = design_system.get("project_name", "PROJECT")
+def _content_hash(content: str) -> str:
+    """Hash of a persisted file's content without its volatile header fields (e.g. Generated)."""
+    return hashlib.sha256(VOLATILE_LINE.sub("", content).encode("utf-8")).hexdigest()
+
+
+def _create_temp(path: Path) -> tuple:
+    """Open a new temp file beside path as (fd, name), created 0666 so the kernel applies the umask."""
+    while True:
+        tmp = path.parent / f".{path.name}.{os.urandom(6).hex()}.tmp"
+        try:
+            return os.open(tmp, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace path with content unless only volatile fields differ; True if written."""
+    try:
+        existing = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        existing = None
+    if existing is not None and _content_hash(existing) == _content_hash(content):
+        return False
+
+    fd, tmp = _create_temp(path)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)  # a rewrite keeps the file's permissions
+        except FileNotFoundError:
+            pass  # new file: the umask-based mode from _create_temp stands
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+
+def expand_pages(page, pages_dir: Path) -> list:
+    """Page names from a name, comma-separated string or list; globs match existing override files."""
+    if not page:
+        return []
+    names = page.split(",") if isinstance(page, str) else page
+    pages = []
+    for name in (name.strip() for name in names):
+        if any(ch in name for ch in "*?["):
+            pages.extend(sorted(path.stem for path in pages_dir.glob(f"{name}.md")))
+        elif name:
+            pages.append(name)
+    return list(dict.fromkeys(pages))
+
+
+def _persist_pages(design_system: dict, pages: list, pages_dir: Path, context: SearchContext = None) -> list:
+    """Write override files for (page_name, page_query) pages concurrently; returns (path, written) pairs."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    overrides = _generate_overrides_batch(pages, context)
+
+    def write(item):
+        (page, page_query), page_overrides = item
+        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
+        page_content = format_page_override_md(design_system, page, page_query, page_overrides)
+        return str(page_file), _write_if_changed(page_file, page_content)
+
+    workers = max(1, min(len(pages), PAGE_WRITE_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-pages") as pool:
+        return list(pool.map(write, zip(pages, overrides)))
+
+
+def format_master_md(design_system: dict, write=None) -> str:
+    """Format design system as MASTER.md with hierarchical override logic; streamed to write if given."""
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
     colors = design_system.get("colors", {})
     typography = design_system.get("typography", {})
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    lines = []
-    
-    # Logic header
-    lines.append("# Design System Master File")
-    lines.append("")
-    lines.append("> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.")
-    lines.append("> If that file exists, its rules **override** this Master file.")
-    lines.append("> If not, strictly follow the rules below.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append(f"**Project:** {project}")
-    lines.append(f"**Generated:** {timestamp}")
-    lines.append(f"**Category:** {design_system.get('category', 'General')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
-    # Global Rules section
-    lines.append("## Global Rules")
-    lines.append("")
-    
-    # Color Palette
-    lines.append("### Color Palette")
-    lines.append("")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    lines.append(f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |")
-    lines.append(f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |")
-    lines.append(f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |")
-    lines.append(f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |")
-    lines.append(f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |")
-    lines.append("")
-    if colors.get("notes"):
-        lines.append(f"**Color Notes:** {colors.get('notes', '')}")
-        lines.append("")
-    
-    # Typography
-    lines.append("### Typography")
-    lines.append("")
-    lines.append(f"- **Heading Font:** {typography.get('heading', 'Inter')}")
-    lines.append(f"- **Body Font:** {typography.get('body', 'Inter')}")
-    if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
-    if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})")
-    lines.append("")
-    if typography.get("css_import"):
-        lines.append("**CSS Import:**")
-        lines.append("```css")
-        lines.append(typography.get("css_import", ""))
-        lines.append("```")
-        lines.append("")
-    
-    # Spacing Variables
-    lines.append("### Spacing Variables")
-    lines.append("")
-    lines.append("| Token | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--space-xs` | `4px` / `0.25rem` | Tight gaps |")
-    lines.append("| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |")
-    lines.append("| `--space-md` | `16px` / `1rem` | Standard padding |")
-    lines.append("| `--space-lg` | `24px` / `1.5rem` | Section padding |")
-    lines.append("| `--space-xl` | `32px` / `2rem` | Large gaps |")
-    lines.append("| `--space-2xl` | `48px` / `3rem` | Section margins |")
-    lines.append("| `--space-3xl` | `64px` / `4rem` | Hero padding |")
-    lines.append("")
-    
-    # Shadow Depths
-    lines.append("### Shadow Depths")
-    lines.append("")
-    lines.append("| Level | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |")
-    lines.append("| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |")
-    lines.append("| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |")
-    lines.append("| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |")
-    lines.append("")
-    
-    # Component Specs section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Component Specs")
-    lines.append("")
-    
-    # Buttons
-    lines.append("### Buttons")
-    lines.append("")
-    lines.append("```css")
-    lines.append("/* Primary Button */")
-    lines.append(".btn-primary {")
-    lines.append(f"  background: {colors.get('cta', '#F97316')};")
-    lines.append("  color: white;")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".btn-primary:hover {")
-    lines.append("  opacity: 0.9;")
-    lines.append("  transform: translateY(-1px);")
-    lines.append("}")
-    lines.append("")
-    lines.append("/* Secondary Button */")
-    lines.append(".btn-secondary {")
-    lines.append(f"  background: transparent;")
-    lines.append(f"  color: {colors.get('primary', '#2563EB')};")
-    lines.append(f"  border: 2px solid {colors.get('primary', '#2563EB')};")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Cards
-    lines.append("### Cards")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".card {")
-    lines.append(f"  background: {colors.get('background', '#FFFFFF')};")
-    lines.append("  border-radius: 12px;")
-    lines.append("  padding: 24px;")
-    lines.append("  box-shadow: var(--shadow-md);")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".card:hover {")
-    lines.append("  box-shadow: var(--shadow-lg);")
-    lines.append("  transform: translateY(-2px);")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Inputs
-    lines.append("### Inputs")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".input {")
-    lines.append("  padding: 12px 16px;")
-    lines.append("  border: 1px solid #E2E8F0;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-size: 16px;")
-    lines.append("  transition: border-color 200ms ease;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".input:focus {")
-    lines.append(f"  border-color: {colors.get('primary', '#2563EB')};")
-    lines.append("  outline: none;")
-    lines.append(f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Modals
-    lines.append("### Modals")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".modal-overlay {")
-    lines.append("  background: rgba(0, 0, 0, 0.5);")
-    lines.append("  backdrop-filter: blur(4px);")
-    lines.append("}")
-    lines.append("")
-    lines.append(".modal {")
-    lines.append("  background: white;")
-    lines.append("  border-radius: 16px;")
-    lines.append("  padding: 32px;")
-    lines.append("  box-shadow: var(--shadow-xl);")
-    lines.append("  max-width: 500px;")
-    lines.append("  width: 90%;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Style section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Style Guidelines")
-    lines.append("")
-    lines.append(f"**Style:** {style.get('name', 'Minimalism')}")
-    lines.append("")
-    if style.get("keywords"):
-        lines.append(f"**Keywords:** {style.get('keywords', '')}")
-        lines.append("")
-    if style.get("best_for"):
-        lines.append(f"**Best For:** {style.get('best_for', '')}")
-        lines.append("")
-    if effects:
-        lines.append(f"**Key Effects:** {effects}")
-        lines.append("")
-    
-    # Layout Pattern
-    lines.append("### Page Pattern")
-    lines.append("")
-    lines.append(f"**Pattern Name:** {pattern.get('name', '')}")
-    lines.append("")
-    if pattern.get('conversion'):
-        lines.append(f"- **Conversion Strategy:** {pattern.get('conversion', '')}")
-    if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
-    lines.append(f"- **Section Order:** {pattern.get('sections', '')}")
-    lines.append("")
-    
-    # Anti-Patterns section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Anti-Patterns (Do NOT Use)")
-    lines.append("")
-    if anti_patterns:
-        anti_list = [a.strip() for a in anti_patterns.split("+")]
-        for anti in anti_list:
-            if anti:
-                lines.append(f"- ❌ {anti}")
-    lines.append("")
-    lines.append("### Additional Forbidden Patterns")
-    lines.append("")
-    lines.append("- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)")
-    lines.append("- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer")
-    lines.append("- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout")
-    lines.append("- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio")
-    lines.append("- ❌ **Instant state changes** — Always use transitions (150-300ms)")
-    lines.append("- ❌ **Invisible focus states** — Focus states must be visible for a11y")
-    lines.append("")
-    
-    # Pre-Delivery Checklist
-    lines.append("---")
-    lines.append("")
-    lines.append("## Pre-Delivery Checklist")
-    lines.append("")
-    lines.append("Before delivering any UI code, verify:")
-    lines.append("")
-    lines.append("- [ ] No emojis used as icons (use SVG instead)")
-    lines.append("- [ ] All icons from consistent icon set (Heroicons/Lucide)")
-    lines.append("- [ ] `cursor-pointer` on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard navigation")
-    lines.append("- [ ] `prefers-reduced-motion` respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("- [ ] No content hidden behind fixed navbars")
-    lines.append("- [ ] No horizontal scroll on mobile")
-    lines.append("")
-    
-    return "\n".join(lines)
+
+    css_import = typography.get("css_import")
+    values = {
+        "project": design_system.get("project_name", "PROJECT"),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "category": design_system.get("category", "General"),
+        "primary": colors.get("primary", "#2563EB"),
+        "secondary": colors.get("secondary", "#3B82F6"),
+        "cta": colors.get("cta", "#F97316"),
+        "background": colors.get("background", "#F8FAFC"),
+        "card_background": colors.get("background", "#FFFFFF"),
+        "text": colors.get("text", "#1E293B"),
+        "color_notes": f"**Color Notes:** {colors['notes']}\n\n" if colors.get("notes") else "",
+        "heading": typography.get("heading", "Inter"),
+        "body": typography.get("body", "Inter"),
+        "typography_lines": (f"- **Mood:** {typography['mood']}\n" if typography.get("mood") else "")
+                            + (f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]"
+                               f"({typography['google_fonts_url']})\n" if typography.get("google_fonts_url") else ""),
+        "css_import": f"**CSS Import:**\n```css\n{css_import}\n```\n\n" if css_import else "",
+        "style_name": style.get("name", "Minimalism"),
+        "style_lines": (f"**Keywords:** {style['keywords']}\n\n" if style.get("keywords") else "")
+                       + (f"**Best For:** {style['best_for']}\n\n" if style.get("best_for") else "")
+                       + (f"**Key Effects:** {effects}\n\n" if effects else ""),
+        "pattern_name": pattern.get("name", ""),
+        "pattern_lines": (f"- **Conversion Strategy:** {pattern['conversion']}\n" if pattern.get("conversion") else "")
+                         + (f"- **CTA Placement:** {pattern['cta_placement']}\n" if pattern.get("cta_placement") else ""),
+        "sections": pattern.get("sections", ""),
+        "anti_patterns": "".join([f"- ❌ {anti}\n" for anti in (a.strip() for a in anti_patterns.split("+")) if anti]),
+    }
+    return _render(MASTER_TEMPLATE, values, write)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            page_overrides: dict = None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content (page_overrides: precomputed)."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    if page_overrides is None:
+        page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
     
     lines = []
     
@@ -911,29 +1452,40 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    context: SearchContext = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. With the request's context, words the page
+    context shares with earlier searches (usually the whole query) are not rescored.
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
+    combined_context = _page_context(page_name, page_query)
+    context = context or SearchContext()
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
-    
-    # Extract results from search response
-    style_results = style_search.get("results", [])
-    ux_results = ux_search.get("results", [])
-    landing_results = landing_search.get("results", [])
-    
+    searches = [context.search(combined_context, domain, max_results=n) for domain, n in OVERRIDE_SEARCHES]
+    return _build_overrides(combined_context, *(result.get("results", []) for result in searches))
+
+
+def _page_context(page_name: str, page_query: str = None) -> str:
+    """Search context for a page override: page name plus the page query."""
+    return f"{page_name.lower()} {(page_query or '').lower()}"
+
+
+def _generate_overrides_batch(pages: list, context: SearchContext = None) -> list:
+    """Overrides for many (page_name, page_query) pages through one SearchContext.
+
+    Pages share the query's words and contexts that tokenize alike share a ranking, so
+    each distinct (domain, word) is scored once for all of them.
+    """
+    context = context or SearchContext()
+    return [_generate_intelligent_overrides(name, page_query, None, context) for name, page_query in pages]
+
+
+def _build_overrides(combined_context: str, style_results: list, ux_results: list, landing_results: list) -> dict:
+    """Page overrides from the style, ux and landing results for a page context."""
     # Detect page type from search results or context
     page_type = _detect_page_type(combined_context, style_results)
     
@@ -1052,16 +1604,163 @@ def _detect_page_type(context: str, style_results: list) -> str:
     return "General"
 
 
+# ============ BATCH GENERATION ============
+# Threads for generate_batch (None = one per CPU). They overlap the file reads and writes of
+# persisting; generation itself holds the GIL, so for CPU-parallel generation of many design
+# systems use design_pool.generate_many instead (its process start-up outweighs a ~2 ms project).
+BATCH_WORKERS = None
+
+
+def load_manifest(path) -> list:
+    """Project entries from a manifest: a JSON list (or {"projects": [...]}) of queries or dicts
+
+    Entry keys: query (required), project_name, pages (names or {"name", "query"} dicts),
+    output_dir (relative paths are resolved against the manifest's directory), deadline_ms.
+    An unreadable file or one without a project list raises (OSError, ValueError); invalid
+    entries are returned as they are and reported as failed projects by generate_batch.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    entries = manifest.get("projects", []) if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list):
+        raise ValueError("Manifest must be a JSON list of projects or {\"projects\": [...]}")
+
+    projects = []
+    for entry in entries:
+        entry = {"query": entry} if isinstance(entry, str) else entry
+        if isinstance(entry, dict) and isinstance(entry.get("output_dir"), str) and entry["output_dir"]:
+            entry = {**entry, "output_dir": str(path.parent / entry["output_dir"])}
+        projects.append(entry)
+    return projects
+
+
+def _manifest_error(entry) -> str:
+    """Why a manifest entry cannot be generated, or None if it is valid."""
+    if not isinstance(entry, dict):
+        return f"Manifest entry must be a query string or an object, got {entry!r}"
+    if not isinstance(entry.get("query"), str) or not entry["query"].strip():
+        return f"Manifest entry without a query: {entry!r}"
+    for key in ("project_name", "output_dir"):
+        if entry.get(key) is not None and not isinstance(entry[key], str):
+            return f"Manifest {key} must be a string, got {entry[key]!r}"
+    deadline_ms = entry.get("deadline_ms")
+    if deadline_ms is not None and (isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float))):
+        return f"Manifest deadline_ms must be a number, got {deadline_ms!r}"
+    pages = entry.get("pages", [])
+    if not isinstance(pages, list) or not all(
+            isinstance(page, str) or (isinstance(page, dict) and isinstance(page.get("name"), str))
+            for page in pages):
+        return f"Manifest pages must be names or {{\"name\", \"query\"}} objects, got {pages!r}"
+    return None
+
+
+def _generate_project(generator: DesignSystemGenerator, entry: dict, output_dir: str = None,
+                      materialized: bool = None) -> dict:
+    """Generate and persist one manifest project; failures are reported, not raised."""
+    start = time.perf_counter()
+    error = _manifest_error(entry)
+    if error:
+        return {"query": entry.get("query") if isinstance(entry, dict) else None, "error": error, "seconds": 0.0}
+    context = SearchContext()
+    try:
+        design_system = generator.generate(entry["query"], entry.get("project_name"), entry.get("deadline_ms"),
+                                           materialized, context)
+        persisted = persist_design_system(design_system, None, entry.get("output_dir") or output_dir)
+        pages = [(page, entry["query"]) if isinstance(page, str) else (page["name"], page.get("query", entry["query"]))
+                 for page in entry.get("pages", [])]
+        if pages:
+            pages_dir = Path(persisted["design_system_dir"]) / "pages"
+            for path, written in _persist_pages(design_system, pages, pages_dir, context):
+                persisted["created_files"].append(path)
+                persisted["written_files" if written else "unchanged_files"].append(path)
+    except Exception as e:
+        return {"query": entry["query"], "error": f"{type(e).__name__}: {e}",
+                "seconds": round(time.perf_counter() - start, 4)}
+    return {
+        "query": entry["query"],
+        "project_name": design_system["project_name"],
+        "category": design_system["category"],
+        "design_system_dir": persisted["design_system_dir"],
+        "created_files": persisted["created_files"],
+        "written_files": persisted["written_files"],
+        "unchanged_files": persisted["unchanged_files"],
+        "seconds": round(time.perf_counter() - start, 4)
+    }
+
+
+def generate_batch(entries: list, max_workers: int = None, output_dir: str = None,
+                   materialized: bool = None) -> dict:
+    """Generate and persist many projects with one shared generator on a thread pool (see BATCH_WORKERS)
+
+    entries: load_manifest() dicts. Returns per-project results in order plus timings; an
+    invalid entry or a failed generation is reported with an "error" and counted in "failed".
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    start = time.perf_counter()
+    generator = DesignSystemGenerator()
+    workers = max(1, min(len(entries), max_workers or BATCH_WORKERS or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-manifest") as pool:
+        projects = list(pool.map(lambda entry: _generate_project(generator, entry, output_dir, materialized),
+                                 entries))
+    return {
+        "projects": projects,
+        "count": len(projects),
+        "failed": sum(1 for project in projects if "error" in project),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 4),
+        "project_seconds": round(sum(project["seconds"] for project in projects), 4)
+    }
+
+
+def format_batch_summary(summary: dict) -> str:
+    """Markdown table of a generate_batch() run"""
+    lines = [
+        "## UI Pro Max Manifest Summary",
+        f"**Projects:** {summary['count']} | **Failed:** {summary['failed']} | **Workers:** {summary['workers']} | "
+        f"**Wall time:** {summary['seconds']}s | **Sum of project times:** {summary['project_seconds']}s",
+        "",
+        "| Project | Category | Files | Written | Seconds |",
+        "|---------|----------|-------|---------|---------|",
+    ]
+    for project in summary["projects"]:
+        if "error" in project:
+            lines.append(f"| {project['query'] or '(no query)'} | **Error:** {project['error']} | 0 | 0 | "
+                         f"{project['seconds']} |")
+        else:
+            lines.append(f"| {project['project_name']} | {project['category']} | "
+                         f"{len(project['created_files'])} | {len(project['written_files'])} | {project['seconds']} |")
+    return "\n".join(lines)
+
+
 # ============ CLI SUPPORT ============
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Generate Design System")
-    parser.add_argument("query", help="Search query (e.g., 'SaaS dashboard')")
+    parser.add_argument("query", nargs="?", help="Search query (e.g., 'SaaS dashboard')")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format")
+    parser.add_argument("--format", "-f", choices=OUTPUT_FORMATS, default="ascii", help="Output format")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="Latency budget for optional domains")
+    parser.add_argument("--token-budget", type=int, default=None, help="Max output tokens (approximate)")
+    parser.add_argument("--materialized", action="store_true", help="Serve known categories from the built table")
+    parser.add_argument("--build-materialized", action="store_true",
+                        help="Precompute every product category's design system and exit")
 
     args = parser.parse_args()
 
-    result = generate_design_system(args.query, args.project_name, args.format)
-    print(result)
+    if args.build_materialized:
+        print(f"Built {build_materialized()}")
+    elif args.query is None:
+        parser.error("query is required unless --build-materialized is given")
+    elif args.format == "msgpack" and msgpack is None:
+        parser.error("--format msgpack needs the msgpack package (pip install msgpack)")
+    else:
+        result = generate_design_system(args.query, args.project_name, args.format, deadline_ms=args.deadline_ms,
+                                        token_budget=args.token_budget, materialized=args.materialized or None)
+        if isinstance(result, bytes):
+            sys.stdout.buffer.write(result)
+            sys.stdout.flush()
+        else:
+            print(result)
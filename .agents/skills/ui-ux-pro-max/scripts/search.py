@@ -2,12 +2,25 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
-       python search.py "<query>" --design-system [-p "Project Name"]
-       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3] [--engine bm25|fts5]
+       python search.py "<query>" --domain ux --where Severity=High --where Platform=Web
+       python search.py "<query>" --stack nextjs,shadcn,html-tailwind [--per-stack 2]
+       python search.py "<query>" --domain ux --paginate   then   python search.py --cursor <token>
+       python search.py "<query>" --design-system [-p "Project Name"] [-f ascii|markdown|json|msgpack]
+       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard,settings,checkout"]
+       python search.py --manifest projects.json [--workers 4] [--json]   (persist many projects in one run)
+       python search.py "<query>" --design-system --materialized   (after python design_system.py --build-materialized)
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
-Stacks: html-tailwind, react, nextjs
+Stacks: html-tailwind, react, nextjs, ... (comma-separate several, or "all", to rank them in one pass)
+
+Filters: --where Column=Value on Category, Severity, Platform, Type (repeat a column to OR values)
+Facets:  --facets Category,Severity counts matching rows per value (plus Stack for multi-stack search)
+Engines: bm25 (default, in-process), fts5 (SQLite FTS5 with column-weighted bm25())
+Latency: --deadline-ms N returns best-so-far results (design system: skips optional domains) when time runs out
+Budget:  --token-budget N packs the most valuable fields of the top results into about N tokens
+Snippets: long fields are cut to the window densest in query terms (--snippet-chars N, default 300)
+Paging:  --paginate prints a cursor for the next page; --cursor fetches it from the cached ranking (bm25 only)
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
@@ -17,8 +30,16 @@ Persistence (Master + Overrides pattern):
 import argparse
 import sys
 import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+from pathlib import Path
+import core
+import design_system
+from core import CSV_CONFIG, AVAILABLE_STACKS, AVAILABLE_ENGINES, MAX_RESULTS, search, search_stack, search_page
+from design_system import (generate_design_system, persist_design_system, load_manifest, generate_batch,
+                           format_batch_summary, expand_pages, OUTPUT_FORMATS)
+from token_budget import estimate_tokens, pack_result
+
+# Long fields are cut to a query-aware window of about this many characters
+SNIPPET_CHARS = 300
 
 # Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -27,8 +48,11 @@ if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
-def format_output(result):
-    """Format results for Claude consumption (token-optimized)"""
+def format_output(result, max_chars=SNIPPET_CHARS):
+    """Format results for Claude consumption (token-optimized)
+
+    Long fields show their query-aware snippet when the result has one, else their first max_chars.
+    """
     if "error" in result:
         return f"Error: {result['error']}"
 
@@ -39,49 +63,142 @@ def format_output(result):
     else:
         output.append(f"## UI Pro Max Search Results")
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+    if result.get("filters"):
+        filters = " AND ".join(f"{col}={'|'.join(values)}" for col, values in result["filters"].items())
+        output.append(f"**Filters:** {filters}")
+    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results")
+    if result.get("omitted_fields"):
+        output.append(f"**Budget:** {result['token_budget']} tokens | {result['omitted_fields']} fields omitted")
+    if result.get("partial"):
+        output.append(f"**Partial:** deadline reached after {result['completed']:.0%} of scoring (best so far)")
+    for col, counts in result.get("facets", {}).items():
+        summary = ", ".join(f"{value} ({count})" for value, count in counts.items()) or "none"
+        output.append(f"**Facets ({col}):** {summary}")
+    if "total" in result:
+        first = result["offset"] + 1 if result["count"] else result["offset"]
+        page = f"**Page:** results {first}-{result['offset'] + result['count']} of {result['total']}"
+        if result.get("next_cursor"):
+            page += f" | **Next:** --cursor {result['next_cursor']}"
+        output.append(page)
+    output.append("")
 
-    for i, row in enumerate(result['results'], 1):
+    snippets = result.get("snippets") or [{}] * len(result['results'])
+    for i, (row, row_snippets) in enumerate(zip(result['results'], snippets), result.get("offset", 0) + 1):
         output.append(f"### Result {i}")
         for key, value in row.items():
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
+            value_str = str(row_snippets.get(key, value))
+            if key not in row_snippets and len(value_str) > max_chars:
+                value_str = value_str[:max_chars] + "..."
             output.append(f"- **{key}:** {value_str}")
         output.append("")
 
     return "\n".join(output)
 
 
+def fit_token_budget(result, token_budget, max_chars=SNIPPET_CHARS):
+    """Trim a search response so format_output renders it in about token_budget tokens"""
+    if "error" in result:
+        return result
+    headers = format_output({**result, "results": [], "omitted_fields": 1, "token_budget": token_budget}, max_chars)
+    return pack_result(result, token_budget, estimate_tokens(headers))
+
+
+def print_result(result, as_json=False, max_chars=SNIPPET_CHARS, token_budget=None):
+    """Print a search response as JSON or format_output text"""
+    if token_budget:
+        result = fit_token_budget(result, token_budget, max_chars)
+    if as_json:
+        import json
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(format_output(result, max_chars))
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query (omit with --cursor)")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--stack", "-s", help=f"Stack-specific search; comma-separate several or use 'all' ({', '.join(AVAILABLE_STACKS)})")
+    parser.add_argument("--per-stack", type=int, default=None, help="Max results per stack when searching several stacks")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--where", "-w", action="append", default=[], metavar="COLUMN=VALUE",
+                        help="Structured filter (Category, Severity, Platform, Type); repeatable")
+    parser.add_argument("--facets", type=str, default=None, help="Comma-separated columns to count matches by (e.g. Category,Severity)")
+    parser.add_argument("--engine", "-e", choices=AVAILABLE_ENGINES, default=None, help="Search backend (default: core.SEARCH_ENGINE)")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="Latency budget; results past it are flagged partial")
+    parser.add_argument("--snippet-chars", type=int, default=None,
+                        help=f"Snippet length for long fields (default: {SNIPPET_CHARS}; with --json: full fields)")
+    parser.add_argument("--token-budget", type=int, default=None, help="Fit output into about N tokens, dropping low-value fields first")
+    parser.add_argument("--paginate", action="store_true", help="Include the total and a cursor for the next page")
+    parser.add_argument("--cursor", type=str, default=None, help="Fetch the page a previous --paginate/--cursor run pointed to")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    parser.add_argument("--format", "-f", choices=OUTPUT_FORMATS, default="ascii",
+                        help="Output format for design system (json/msgpack: versioned schema, msgpack needs the msgpack package)")
+    parser.add_argument("--materialized", action="store_true",
+                        help="Serve the design system from the table built by design_system.py --build-materialized")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--page", type=str, default=None,
+                        help="Create page-specific override files in design-system/pages/ (comma-separate several; globs match existing pages)")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    parser.add_argument("--manifest", type=str, default=None,
+                        help="JSON list of projects (query, project_name, pages, output_dir) to generate and persist in one run")
+    parser.add_argument("--workers", type=int, default=None, help="Threads for --manifest; they overlap file I/O, not generation (default: CPUs)")
 
     args = parser.parse_args()
+    if args.query is None and not args.cursor and not args.manifest:
+        parser.error("a query is required unless --cursor or --manifest is given")
+    if args.design_system and args.format == "msgpack" and design_system.msgpack is None:
+        parser.error("--format msgpack needs the msgpack package (pip install msgpack)")
+    # Text output always snippets long fields; JSON keeps them whole unless asked
+    snippet_chars = args.snippet_chars or (None if args.json else SNIPPET_CHARS)
+
+    if args.engine:
+        core.SEARCH_ENGINE = args.engine
+
+    where = {}
+    for clause in args.where:
+        column, sep, value = clause.partition("=")
+        if not sep or not column.strip():
+            parser.error(f"--where expects COLUMN=VALUE, got '{clause}'")
+        where.setdefault(column.strip(), []).append(value.strip())
 
+    # A manifest persists every project it lists with one shared generator
+    if args.manifest:
+        import json
+        try:
+            entries = load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load manifest {args.manifest}: {e}")
+        summary = generate_batch(entries, args.workers, args.output_dir, args.materialized or None)
+        print(json.dumps(summary, indent=2, ensure_ascii=False) if args.json else format_batch_summary(summary))
+        if summary["failed"]:
+            sys.exit(1)
+    # A cursor carries its original request
+    elif args.cursor:
+        result = search_page(args.cursor)
+        print_result(result, args.json, snippet_chars or SNIPPET_CHARS, args.token_budget)
     # Design system takes priority
-    if args.design_system:
+    elif args.design_system:
         result = generate_design_system(
             args.query, 
             args.project_name, 
-            args.format,
+            "json" if args.json and args.format == "ascii" else args.format,
             persist=args.persist,
             page=args.page,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            deadline_ms=args.deadline_ms,
+            token_budget=args.token_budget,
+            materialized=args.materialized or None
         )
-        print(result)
+        if isinstance(result, bytes):
+            sys.stdout.buffer.write(result)
+            sys.stdout.flush()
+        else:
+            print(result)
         
         # Print persistence confirmation
         if args.persist:
@@ -90,25 +207,21 @@ if __name__ == "__main__":
             print(f"✅ Design system persisted to design-system/{project_slug}/")
             print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
             if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
-                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
+                pages_dir = Path(args.output_dir or ".") / "design-system" / project_slug / "pages"
+                for page in expand_pages(args.page, pages_dir):
+                    page_filename = page.lower().replace(' ', '-')
+                    print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
             print("")
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+        result = search_stack(args.query, args.stack, args.max_results, where=where, per_stack=args.per_stack,
+                              facets=args.facets, paginate=args.paginate, snippet_chars=snippet_chars)
+        print_result(result, args.json, snippet_chars or SNIPPET_CHARS, args.token_budget)
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+        result = search(args.query, args.domain, args.max_results, where=where, facets=args.facets,
+                        paginate=args.paginate, deadline_ms=args.deadline_ms, snippet_chars=snippet_chars)
+        print_result(result, args.json, snippet_chars or SNIPPET_CHARS, args.token_budget)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Shards - scatter-gather BM25 search across a process pool
+
+A dataset with "shards": N in its CSV_CONFIG/STACK_CONFIG entry is split into
+N contiguous document ranges. Each range is fitted and scored in a worker
+process using global IDF/avgdl statistics, so shard scores are comparable and
+the merged top-k is exactly the top-k of an unsharded search.
+"""
+
+import atexit
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from math import log
+
+from core import BM25, _build_documents, _facet_dict, _filter_value, _load_csv
+
+# ============ CONFIGURATION ============
+# Max worker processes (None = one per CPU, capped at the shard count)
+SHARD_WORKERS = None
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+_global_stats = {}  # (path, cols, signature, shards) -> (idf, avgdl)
+
+
+# ============ WORKER SIDE ============
+_worker_shards = {}  # (path, cols, signature, shards, shard) -> (offset, BM25, rows)
+
+
+def _load_shard(filepath, search_cols, signature, n_shards, shard):
+    """Fit (once per worker process) the BM25 index for one document range"""
+    key = (str(filepath), tuple(search_cols), signature, n_shards, shard)
+    if key not in _worker_shards:
+        data = _load_csv(filepath)
+        documents = _build_documents(data, search_cols)
+        start = shard * len(documents) // n_shards
+        end = (shard + 1) * len(documents) // n_shards
+        bm25 = BM25()
+        bm25.fit(documents[start:end])
+        _worker_shards[key] = (start, bm25, data[start:end])
+    return _worker_shards[key]
+
+
+def _shard_stats(filepath, search_cols, signature, n_shards, shard):
+    """Local document frequencies, document count and total length of a shard"""
+    _, bm25, _ = _load_shard(filepath, search_cols, signature, n_shards, shard)
+    return dict(bm25.doc_freqs), bm25.N, sum(bm25.doc_lengths)
+
+
+def _shard_top_k(filepath, search_cols, signature, n_shards, shard, idf, avgdl, query, k, candidates=None,
+                 facets=None):
+    """Score a shard with global statistics; return its top-k as global ids and its facet counts"""
+    start, bm25, rows = _load_shard(filepath, search_cols, signature, n_shards, shard)
+    if bm25.N == 0:
+        return [], {}
+    local = None if candidates is None else [idx - start for idx in candidates]
+    ranked = bm25.with_stats(idf, avgdl).score(query, local)
+
+    # Facets are counted over every matching row of the shard, keyed by normalized value
+    facet_counts = {col: {} for col in facets or ()}
+    for idx, score in ranked:
+        if score <= 0:
+            break
+        for col, counts in facet_counts.items():
+            value = _filter_value(rows[idx].get(col))
+            counts[value] = counts.get(value, 0) + 1
+
+    return [(start + idx, score) for idx, score in ranked[:k] if score > 0], facet_counts
+
+
+# ============ COORDINATOR ============
+def _get_pool(n_shards):
+    """Return the shared process pool, growing it if more shards need workers"""
+    global _pool, _pool_size
+    size = min(n_shards, SHARD_WORKERS or os.cpu_count() or 1)
+    with _pool_lock:
+        if _pool is None or _pool_size < size:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=size)
+            _pool_size = size
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shard worker processes"""
+    global _pool, _pool_size
+    with _pool_lock:
+        pool, _pool, _pool_size = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def _get_global_stats(pool, filepath, search_cols, signature, n_shards):
+    """Gather shard statistics and merge them into global IDF and avgdl"""
+    key = (str(filepath), tuple(search_cols), signature, n_shards)
+    if key not in _global_stats:
+        futures = [pool.submit(_shard_stats, filepath, search_cols, signature, n_shards, shard)
+                   for shard in range(n_shards)]
+        doc_freqs, n_docs, total_length = {}, 0, 0
+        for future in futures:
+            freqs, n, length = future.result()
+            for word, freq in freqs.items():
+                doc_freqs[word] = doc_freqs.get(word, 0) + freq
+            n_docs += n
+            total_length += length
+        idf = {word: log((n_docs - freq + 0.5) / (freq + 0.5) + 1) for word, freq in doc_freqs.items()}
+        _global_stats[key] = (idf, total_length / n_docs if n_docs else 0)
+    return _global_stats[key]
+
+
+def search_sharded(snapshot, query, max_results, n_shards, candidates=None, facets=None, deadline=None):
+    """Rank a dataset across n_shards worker processes
+
+    Returns ([(idx, score)] like BM25.score, facet counts or None, fraction of shards merged).
+    candidates: optional ascending global row ids (from where= filters) to score
+    deadline: optional time.perf_counter() value; shards still running then are left out
+    """
+    filepath, search_cols, signature = snapshot.filepath, list(snapshot.search_cols), snapshot.signature
+    pool = _get_pool(n_shards)
+
+    idf, avgdl = _get_global_stats(pool, filepath, search_cols, signature, n_shards)
+    # Only the query's terms are needed by the workers
+    query_idf = {t: idf[t] for t in BM25().tokenize(query) if t in idf}
+    if not query_idf:
+        return [], ({col: {} for col in facets} if facets else None), 1.0
+
+    n_docs = len(snapshot.data)
+    futures = []
+    for shard in range(n_shards):
+        shard_candidates = None
+        if candidates is not None:
+            start = shard * n_docs // n_shards
+            end = (shard + 1) * n_docs // n_shards
+            shard_candidates = [idx for idx in candidates if start <= idx < end]
+            if not shard_candidates:
+                continue
+        futures.append(pool.submit(_shard_top_k, filepath, search_cols, signature, n_shards, shard,
+                                   query_idf, avgdl, query, max_results, shard_candidates, facets))
+    completed = 1.0
+    if deadline is not None and futures:
+        finished, pending = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+        for future in pending:
+            future.cancel()
+        completed = len(finished) / len(futures)
+        futures = [future for future in futures if future in finished]
+
+    hits, merged = [], {col: {} for col in facets or ()}
+    for future in futures:
+        shard_hits, shard_facets = future.result()
+        hits.extend(shard_hits)
+        for col, counts in shard_facets.items():
+            for value, count in counts.items():
+                merged[col][value] = merged[col].get(value, 0) + count
+
+    facet_counts = None
+    if facets:
+        facet_counts = {}
+        for col in facets:
+            if col not in snapshot.facets:
+                raise ValueError(f"Column '{col}' is not in {snapshot.filepath.name}")
+            values = snapshot.facets[col][0]
+            counts = [merged[col].get(_filter_value(value), 0) for value in values]
+            facet_counts[col] = _facet_dict(values, counts)
+
+    # Same order as a stable sort by score: higher score first, then lower id
+    return heapq.nsmallest(max_results, hits, key=lambda hit: (-hit[1], hit[0])), facet_counts, completed
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Snippets - query-aware windows over long fields
+
+When an index is built, the character offset of every token in long field
+values is recorded per column (token -> packed row/offset array). At query
+time the offsets of the query's tokens are looked up for each returned
+field and the window of the requested length holding the most query terms
+is cut out, so the field itself is never re-tokenized.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+
+# ============ CONFIGURATION ============
+SNIPPET_MIN_CHARS = 120  # shorter values get no positions and are shown whole
+
+_WORD = re.compile(r"\w+")      # the tokens BM25.tokenize produces
+_SPACE = re.compile(r"\s")
+_OFFSET_BITS = 24
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+
+# ============ INDEX TIME ============
+def build_positions(data):
+    """Map column -> token -> sorted array of (row << 24 | char offset) for long values"""
+    positions = {}
+    for idx, row in enumerate(data):
+        for col, value in row.items():
+            if not isinstance(value, str) or len(value) < SNIPPET_MIN_CHARS or len(value) > _OFFSET_MASK:
+                continue
+            table = positions.setdefault(col, {})
+            for match in _WORD.finditer(value):
+                if match.end() - match.start() > 2:
+                    table.setdefault(match.group().lower(), array("Q")).append(idx << _OFFSET_BITS | match.start())
+    return positions
+
+
+# ============ QUERY TIME ============
+def _hits(positions, idx, col, query_tokens):
+    """Sorted (offset, length, token) of every query token occurrence in one field"""
+    table = positions.get(col)
+    if not table:
+        return []
+    hits = []
+    for token in query_tokens:
+        offsets = table.get(token)
+        if offsets:
+            lo = bisect_left(offsets, idx << _OFFSET_BITS)
+            hi = bisect_left(offsets, (idx + 1) << _OFFSET_BITS)
+            hits.extend((packed & _OFFSET_MASK, len(token), token) for packed in offsets[lo:hi])
+    hits.sort()
+    return hits
+
+
+def _densest(hits, length):
+    """(start, end) of the hit span with the most distinct query terms (then hits) fitting length"""
+    best, best_span = None, (0, 0)
+    end = 0
+    for i, (start, _, _) in enumerate(hits):
+        end = max(end, i)
+        while end + 1 < len(hits) and hits[end + 1][0] + hits[end + 1][1] <= start + length:
+            end += 1
+        window = hits[i:end + 1]
+        score = (len({token for _, _, token in window}), len(window))
+        if best is None or score > best:
+            best = score
+            best_span = (start, max(offset + size for offset, size, _ in window))
+    return best_span
+
+
+def snippet(value, positions, idx, col, query_tokens, length):
+    """Window of about length chars of value around its densest cluster of query terms
+
+    Falls back to the start of the field when no query term occurs in it.
+    """
+    if len(value) <= length:
+        return value
+    first, last = _densest(_hits(positions, idx, col, set(query_tokens)), length)
+
+    # Center the matched span, then snap both ends to whitespace without cutting into it
+    start = max(0, min(first - (length - (last - first)) // 2, len(value) - length))
+    stop = min(len(value), start + length)
+    if start > 0:
+        space = _SPACE.search(value, start, first)
+        if space:
+            start = space.end()
+    if stop < len(value):
+        spaces = [m.start() for m in _SPACE.finditer(value, last, stop)]
+        if spaces:
+            stop = spaces[-1]
+    return ("..." if start > 0 else "") + value[start:stop].strip() + ("..." if stop < len(value) else "")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Stored Fields - compressed row storage for warm and cached indexes
+
+Long output columns (code examples, checklists, design variables, ...) hold
+most of a dataset's bytes but are only read for the few rows a search
+returns. StoredRows keeps each such column as raw-deflate blocks of
+STORED_BLOCK_ROWS values, compressed against a small preset dictionary of
+phrases that recur in that column, and inflates a block only when one of
+its rows is returned. Short columns stay as plain strings.
+"""
+
+import re
+import zlib
+from collections import Counter
+
+# ============ CONFIGURATION ============
+STORED_BLOCK_ROWS = 8          # values per compressed block
+STORED_MIN_AVG_BYTES = 48      # columns with shorter values on average stay uncompressed
+STORED_DICT_RATIO = 24         # preset dictionary size: column bytes / ratio (zlib caps it at 32 KiB)
+STORED_LEVEL = 9
+
+_SEPARATOR = "\x1e"
+_MAX_DICT = 32768
+_PHRASE = re.compile(r"\S+\s*")
+
+
+def _build_zdict(values, size):
+    """Preset dictionary of the phrases (1-4 words) that save the most bytes across values"""
+    counts = Counter()
+    for value in values:
+        words = _PHRASE.findall(value)
+        counts.update({"".join(words[i:i + n]) for n in range(1, 5) for i in range(len(words) - n + 1)})
+
+    phrases, total = [], 0
+    for phrase, count in sorted(counts.items(), key=lambda item: (-item[1] * len(item[0]), item[0])):
+        if count < 2:
+            continue
+        if total + len(phrase) > size or any(phrase in chosen for chosen in phrases):
+            continue
+        phrases.append(phrase)
+        total += len(phrase)
+    # zlib finds matches at the end of the dictionary most cheaply, so the best phrases go last
+    return "".join(reversed(phrases)).encode("utf-8")
+
+
+def _deflate(text, zdict):
+    compressor = zlib.compressobj(STORED_LEVEL, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def _inflate(blob, zdict):
+    return zlib.decompressobj(-15, zdict).decompress(blob).decode("utf-8")
+
+
+class StoredRows:
+    """Read-only sequence of CSV row dicts with long columns stored compressed"""
+
+    def __init__(self, data):
+        self.columns = tuple(data[0].keys()) if data else ()
+        self.n = len(data)
+        self.plain = {}    # column -> list of values
+        self.packed = {}   # column -> (zdict, [block blobs])
+        for col in self.columns:
+            values = [row.get(col) for row in data]
+            packed = self._pack(values)
+            if packed is None:
+                self.plain[col] = values
+            else:
+                self.packed[col] = packed
+
+    @staticmethod
+    def _pack(values):
+        """Compressed blocks for a column, or None if it is short or would not shrink"""
+        if not values or any(value is None or _SEPARATOR in value for value in values):
+            return None
+        raw = sum(len(value.encode("utf-8")) for value in values)
+        if raw / len(values) < STORED_MIN_AVG_BYTES:
+            return None
+        zdict = _build_zdict(values, min(_MAX_DICT, raw // STORED_DICT_RATIO))
+        blocks = [_deflate(_SEPARATOR.join(values[i:i + STORED_BLOCK_ROWS]), zdict)
+                  for i in range(0, len(values), STORED_BLOCK_ROWS)]
+        if len(zdict) + sum(len(block) for block in blocks) >= raw:
+            return None
+        return zdict, blocks
+
+    def row(self, idx, columns=None):
+        """Row dict restricted to columns (default: all), inflating only what is needed"""
+        if not 0 <= idx < self.n:
+            raise IndexError(idx)
+        result = {}
+        for col in (self.columns if columns is None else columns):
+            if col in self.plain:
+                result[col] = self.plain[col][idx]
+            elif col in self.packed:
+                zdict, blocks = self.packed[col]
+                block, offset = divmod(idx, STORED_BLOCK_ROWS)
+                result[col] = _inflate(blocks[block], zdict).split(_SEPARATOR)[offset]
+        return result
+
+    def stored_bytes(self):
+        """Bytes held by column values (compressed size for packed columns)"""
+        plain = sum(len((value or "").encode("utf-8")) for values in self.plain.values() for value in values)
+        packed = sum(len(zdict) + sum(len(block) for block in blocks) for zdict, blocks in self.packed.values())
+        return plain + packed
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, idx):
+        return self.row(idx)
+
+    def __iter__(self):
+        return (self.row(idx) for idx in range(self.n))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max persistence checks - persisted files keep shareable permissions
+Usage: python test_persist.py   (or: python -m pytest test_persist.py)
+"""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from design_system import _write_if_changed
+
+
+def _mode(path):
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_new_file_follows_umask():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "MASTER.md"
+        assert _write_if_changed(path, "# one\n")
+        umask = os.umask(0)
+        os.umask(umask)
+        assert _mode(path) == 0o666 & ~umask
+
+
+def test_rewrite_keeps_permissions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "MASTER.md"
+        path.write_text("# one\n", encoding="utf-8")
+        for mode in (0o644, 0o664, 0o600):
+            os.chmod(path, mode)
+            assert _write_if_changed(path, f"# {mode}\n")
+            assert _mode(path) == mode
+            assert path.read_text(encoding="utf-8") == f"# {mode}\n"
+
+
+def test_unchanged_file_is_not_rewritten():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "MASTER.md"
+        _write_if_changed(path, "# Title\n**Generated:** 2026-01-01 00:00:00\n")
+        assert not _write_if_changed(path, "# Title\n**Generated:** 2026-02-02 00:00:00\n")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max token budget checks - budgeted design systems fit or say they do not
+Usage: python test_token_budget.py   (or: python -m pytest test_token_budget.py)
+"""
+
+import contextlib
+import io
+import json
+
+from design_system import generate_design_system
+from token_budget import estimate_tokens
+
+QUERIES = ["SaaS dashboard analytics", "beauty spa wellness service", "e-commerce luxury"]
+BUDGETS = [50, 100, 300, 600, 1000, 5000]
+
+
+def _generate(query, output_format, budget):
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        output = generate_design_system(query, output_format=output_format, token_budget=budget)
+    return output, stderr.getvalue()
+
+
+def test_json_reports_the_estimate():
+    for query in QUERIES:
+        for budget in BUDGETS:
+            output, _ = _generate(query, "json", budget)
+            document = json.loads(output)
+            tokens = estimate_tokens(output)
+            assert document["token_budget"] == budget
+            assert document["token_estimate"] == tokens, (query, budget)
+            assert document["over_budget"] == (tokens > budget), (query, budget)
+
+
+def test_text_fits_or_warns():
+    for query in QUERIES:
+        for output_format in ("ascii", "markdown"):
+            for budget in BUDGETS:
+                output, warning = _generate(query, output_format, budget)
+                if estimate_tokens(output) <= budget:
+                    assert not warning, (query, output_format, budget)
+                else:
+                    assert "over the token budget" in warning, (query, output_format, budget)
+
+
+def test_generous_budget_changes_nothing():
+    for query in QUERIES:
+        output, warning = _generate(query, "markdown", 100000)
+        assert output == generate_design_system(query, output_format="markdown") and not warning
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
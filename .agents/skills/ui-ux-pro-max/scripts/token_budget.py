@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Token Budget - fit search output into N LLM tokens
+
+Token cost is estimated locally (UTF-8 bytes / 4, the usual rule of thumb
+for BPE tokenizers on English and code). Fields are then packed greedily by
+value: higher-ranked results and earlier (more identifying) columns are worth
+more, and fields that contain a query term are worth double. Low-value
+columns of low-ranked results are the first to go.
+"""
+
+import re
+
+# ============ CONFIGURATION ============
+BYTES_PER_TOKEN = 4
+RESULT_OVERHEAD = 6    # "### Result N" heading and spacing
+QUERY_MATCH_BOOST = 2.0
+
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text):
+    """Fast approximation of the LLM tokens text will cost"""
+    return (len(str(text).encode("utf-8")) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def field_cost(key, value):
+    """Estimated tokens of one rendered "- **key:** value" line"""
+    return estimate_tokens(f"- **{key}:** {value}\n")
+
+
+def pack_result(result, budget, reserve=0):
+    """Copy of a search/search_stack response trimmed to fit budget tokens
+
+    reserve: tokens already spent on headers. Each result keeps its first column (its
+    name) or is dropped whole; "snippets" are used for cost and trimmed alongside.
+    """
+    rows = result.get("results", [])
+    snippets = result.get("snippets") or [{}] * len(rows)
+    query_tokens = {w for w in _WORD.findall(str(result.get("query", "")).lower()) if len(w) > 2}
+
+    candidates = []
+    for rank, (row, row_snippets) in enumerate(zip(rows, snippets)):
+        for position, (key, value) in enumerate(row.items()):
+            shown = str(row_snippets.get(key, value))
+            value_score = 1.0 / (rank + 1) / (position + 1)
+            if query_tokens & set(_WORD.findall(shown.lower())):
+                value_score *= QUERY_MATCH_BOOST
+            candidates.append((-value_score, rank, position, key, field_cost(key, shown)))
+    candidates.sort()
+
+    remaining = budget - reserve
+    kept = [set() for _ in rows]
+    first_keys = [next(iter(row), None) for row in rows]
+    for _, rank, position, key, cost in candidates:
+        opened = bool(kept[rank])
+        if not opened and key != first_keys[rank]:
+            continue
+        cost += 0 if opened else RESULT_OVERHEAD
+        if cost <= remaining:
+            kept[rank].add(key)
+            remaining -= cost
+
+    packed = dict(result)
+    packed["results"] = [{k: v for k, v in row.items() if k in keys} for row, keys in zip(rows, kept) if keys]
+    if result.get("snippets") is not None:
+        packed["snippets"] = [{k: v for k, v in s.items() if k in keys} for s, keys in zip(snippets, kept) if keys]
+    packed["count"] = len(packed["results"])
+    packed["token_budget"] = budget
+    packed["omitted_fields"] = sum(len(row) for row in rows) - sum(len(keys) for keys in kept)
+    return packed
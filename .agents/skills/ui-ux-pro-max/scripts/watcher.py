@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Watcher - hot reload of warm indexes when data/ files change
+
+For long-running processes (e.g. an agent server using async_api). A daemon
+thread watches data/*.csv and data/stacks/*.csv (inotify on Linux, mtime polling
+elsewhere). When a file changes, only the warm indexes built from that file are
+rebuilt. Each rebuilt snapshot replaces the old one in core._INDEXES in a single
+assignment, so queries never take a lock: in-flight queries finish on the old
+snapshot and later ones see the new one.
+
+Usage:
+    from watcher import watch_data_dir
+    watcher = watch_data_dir()
+    ...
+    watcher.stop()
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import core
+
+# ============ CONFIGURATION ============
+POLL_INTERVAL = 1.0   # seconds between polls / inotify wake-ups
+SETTLE_DELAY = 0.1    # wait for a burst of writes to finish before rebuilding
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _open_inotify(directories):
+    """Return an inotify fd watching the directories, or None if unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    for directory in directories:
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+    return fd
+
+
+class DataWatcher(threading.Thread):
+    """Background thread that rebuilds warm indexes of changed CSV files"""
+
+    def __init__(self, data_dir=None, interval=POLL_INTERVAL):
+        super().__init__(name="uipro-watcher", daemon=True)
+        self.data_dir = Path(data_dir) if data_dir else core.DATA_DIR
+        self.directories = [d for d in (self.data_dir, self.data_dir / "stacks") if d.is_dir()]
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._inotify_fd = _open_inotify(self.directories)
+        self._signatures = self._scan()  # as of each file's last successful reload
+        self._failed = {}                # path -> signature whose reload failed (retried each interval)
+
+    @property
+    def mode(self):
+        return "inotify" if self._inotify_fd is not None else "polling"
+
+    def _scan(self):
+        """Map every CSV under the watched directories to its signature"""
+        signatures = {}
+        for directory in self.directories:
+            for path in directory.glob("*.csv"):
+                try:
+                    signatures[path] = core._file_signature(path)
+                except OSError:
+                    pass
+        return signatures
+
+    def _changed_paths(self):
+        """CSV files whose signature differs from the last reload, with their current one (None if deleted)"""
+        current = self._scan()
+        changed = {p: sig for p, sig in current.items() if self._signatures.get(p) != sig}
+        changed.update((p, None) for p in set(self._signatures) - set(current))
+        return changed
+
+    def _wait_inotify(self):
+        """Block until a CSV event arrives (or the interval passes); True if one did"""
+        ready, _, _ = select.select([self._inotify_fd], [], [], self.interval)
+        if not ready:
+            return False
+        seen = False
+        try:
+            while True:
+                buf = os.read(self._inotify_fd, 65536)
+                offset = 0
+                while offset < len(buf):
+                    _, _, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                    name = buf[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                    seen = seen or name.endswith(b".csv")
+                    offset += _EVENT_HEADER.size + length
+        except BlockingIOError:
+            pass
+        return seen
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                if self._inotify_fd is not None:
+                    if not self._wait_inotify() and not self._failed:
+                        continue
+                    time.sleep(SETTLE_DELAY)
+                elif self._stop_event.wait(self.interval):
+                    break
+                for path, signature in self._changed_paths().items():
+                    self._reload(path, signature)
+        finally:
+            # Without this thread nothing notices edits, so get_index must check mtimes again
+            core._INDEXES_WATCHED = False
+
+    def _reload(self, path, signature):
+        """Rebuild the indexes of one changed file; on any failure keep the previous snapshot and retry later"""
+        try:
+            core.reload_indexes(path)
+        except Exception as e:
+            # e.g. unreadable mid-edit, or a field over the csv module's limit; log once per version
+            if self._failed.get(path) != signature:
+                print(f"watcher: failed to reload {path}: {type(e).__name__}: {e}", file=sys.stderr)
+            self._failed[path] = signature
+            return
+        self._failed.pop(path, None)
+        if signature is None:
+            self._signatures.pop(path, None)
+        else:
+            self._signatures[path] = signature
+
+    def stop(self):
+        """Stop watching; get_index goes back to checking mtimes on each call"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(self.interval + 1)
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+        core._INDEXES_WATCHED = False
+
+
+def watch_data_dir(data_dir=None, interval=POLL_INTERVAL):
+    """Start a watcher for data_dir (default core.DATA_DIR) and return it"""
+    watcher = DataWatcher(data_dir, interval)
+    core._INDEXES_WATCHED = True
+    watcher.start()
+    return watcher
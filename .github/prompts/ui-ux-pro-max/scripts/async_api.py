@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Async - asyncio counterparts of the search and design-system API
+
+CSV loading, BM25 fitting and scoring run on a managed executor so the event
+loop stays responsive. Identical requests that are in flight at the same time
+share one computation. Every call accepts a per-call timeout (seconds) and can
+be cancelled like any other awaitable.
+
+Usage:
+    from async_api import async_search, async_generate_design_system
+    result = await async_search("glassmorphism dark", "style", timeout=2.0)
+    text = await async_generate_design_system("SaaS dashboard", "My Project")
+"""
+
+import asyncio
+import atexit
+import copy
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import MAX_RESULTS, search, search_stack, search_page
+from design_system import generate_design_system
+
+# ============ CONFIGURATION ============
+# Worker threads for the default executor (None = ThreadPoolExecutor default)
+ASYNC_WORKERS = None
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {}  # (loop, request key) -> _InFlight
+
+
+class _InFlight:
+    """A running computation and the number of callers awaiting it"""
+
+    def __init__(self, future):
+        self.future = future
+        self.waiters = 0
+
+
+# ============ EXECUTOR ============
+def get_executor():
+    """Return the executor used for CPU work, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="uipro-async")
+        return _executor
+
+
+def set_executor(executor):
+    """Use a caller-managed executor (e.g. a ProcessPoolExecutor) for CPU work"""
+    global _executor
+    with _executor_lock:
+        _executor = executor
+
+
+def shutdown_executor(wait=True):
+    """Shut down the default executor; a new one is created on next use"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+atexit.register(shutdown_executor, False)
+
+
+# ============ COALESCING ============
+async def _run_coalesced(key, func, timeout):
+    """Run func on the executor, sharing the result with identical in-flight calls"""
+    loop = asyncio.get_running_loop()
+    inflight_key = (loop, key)
+
+    entry = _inflight.get(inflight_key)
+    if entry is None:
+        entry = _InFlight(loop.run_in_executor(get_executor(), func))
+        _inflight[inflight_key] = entry
+
+        def _forget(_):
+            if _inflight.get(inflight_key) is entry:
+                del _inflight[inflight_key]
+
+        entry.future.add_done_callback(_forget)
+
+    entry.waiters += 1
+    try:
+        # shield: one caller timing out or being cancelled must not cancel the others
+        result = await asyncio.wait_for(asyncio.shield(entry.future), timeout)
+    finally:
+        entry.waiters -= 1
+        if entry.waiters == 0 and not entry.future.done():
+            # Nobody is waiting any more; drop work that has not started yet
+            entry.future.cancel()
+
+    # Callers share one computation, so hand each its own copy of mutable results
+    return copy.deepcopy(result) if isinstance(result, dict) else result
+
+
+# ============ PUBLIC API ============
+async def async_search(query, domain=None, max_results=MAX_RESULTS, engine=None, timeout=None, **options):
+    """Async core.search (options: where, facets, ...); raises asyncio.TimeoutError if timeout (seconds) expires"""
+    key = ("search", query, domain, max_results, engine, repr(sorted(options.items())))
+    func = functools.partial(search, query, domain, max_results, engine, **options)
+    return await _run_coalesced(key, func, timeout)
+
+
+async def async_search_stack(query, stack, max_results=MAX_RESULTS, engine=None, timeout=None, **options):
+    """Async core.search_stack (options: where, per_stack, facets, ...); raises asyncio.TimeoutError on timeout"""
+    key = ("search_stack", repr(stack), query, max_results, engine, repr(sorted(options.items())))
+    func = functools.partial(search_stack, query, stack, max_results, engine, **options)
+    return await _run_coalesced(key, func, timeout)
+
+
+async def async_search_page(cursor, timeout=None):
+    """Async core.search_page; raises asyncio.TimeoutError on timeout"""
+    return await _run_coalesced(("search_page", cursor), functools.partial(search_page, cursor), timeout)
+
+
+async def async_generate_design_system(query, project_name=None, output_format="ascii",
+                                       persist=False, page=None, output_dir=None, timeout=None, deadline_ms=None,
+                                       token_budget=None, materialized=None):
+    """Async design_system.generate_design_system; raises asyncio.TimeoutError if timeout (seconds) expires
+
+    deadline_ms is the generator's own budget: it returns a partial design system instead of failing.
+    page may be a name, a comma-separated string or a list of names; materialized serves known
+    categories from the build_materialized() table (default: design_system.MATERIALIZED_ENABLED).
+    """
+    page_key = tuple(page) if isinstance(page, list) else page
+    key = ("design_system", query, project_name, output_format, persist, page_key, output_dir, deadline_ms,
+           token_budget, materialized)
+    func = functools.partial(generate_design_system, query, project_name, output_format, persist=persist,
+                             page=page, output_dir=output_dir, deadline_ms=deadline_ms, token_budget=token_budget,
+                             materialized=materialized)
+    return await _run_coalesced(key, func, timeout)
@@ -4,16 +4,35 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import copy
 import csv
+import heapq
+import os
 import re
+import threading
+import time
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+import cursors
+import index_cache
+from snippets import build_positions, snippet
+from stored_fields import StoredRows
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Search backend: "bm25" (in-process BM25 class) or "fts5" (SQLite FTS5, see fts5.py)
+SEARCH_ENGINE = "bm25"
+AVAILABLE_ENGINES = ["bm25", "fts5"]
+
+# With deadline_ms, postings are scored best-first and the clock is read every N postings
+DEADLINE_CHECK_EVERY = 64
+
+# Optional per-dataset "shards": N (CSV_CONFIG or STACK_CONFIG entry) splits BM25
+# scoring across N worker processes; results are identical to unsharded search.
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -91,19 +110,29 @@ _STACK_COLS = {
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Structured columns with precomputed per-value bitsets (where= filters) and
+# per-row value ids (facets=). Combined stack indexes also facet on "Stack".
+FILTER_COLS = ["Category", "Severity", "Platform", "Type"]
+
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search
+
+    fit() builds every structure locally and publishes tuples and plain dicts that are
+    never written afterwards, so a fitted index can be scored from many threads at once.
+    """
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.corpus = ()
+        self.doc_lengths = ()
         self.avgdl = 0
         self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.doc_freqs = {}
+        self.postings = {}
+        self.own_stats = True  # False on with_stats copies, whose postings impacts are stale
         self.N = 0
 
     def tokenize(self, text):
@@ -113,29 +142,67 @@ class BM25:
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
+        corpus = tuple(tuple(self.tokenize(doc)) for doc in documents)
+        n_docs = len(corpus)
+        if n_docs == 0:
+            self.corpus, self.N = corpus, 0
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
-
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
-
-    def score(self, query):
-        """Score all documents against query"""
+        doc_lengths = tuple(len(doc) for doc in corpus)
+        avgdl = sum(doc_lengths) / n_docs
+
+        doc_freqs = defaultdict(int)
+        for doc in corpus:
+            for word in set(doc):
+                doc_freqs[word] += 1
+        idf = {word: log((n_docs - freq + 0.5) / (freq + 0.5) + 1) for word, freq in doc_freqs.items()}
+
+        # Impact-ordered postings for score_until: each term's (-contribution, doc id), best first.
+        # Contributions use this index's own idf/avgdl (shard workers, which swap those in, never use them).
+        postings = defaultdict(list)
+        for idx, doc in enumerate(corpus):
+            norm = self.k1 * (1 - self.b + self.b * doc_lengths[idx] / avgdl)
+            for word, tf in Counter(doc).items():
+                postings[word].append((-(idf[word] * (tf * (self.k1 + 1)) / (tf + norm)), idx))
+
+        self.corpus = corpus
+        self.N = n_docs
+        self.doc_lengths = doc_lengths
+        self.avgdl = avgdl
+        self.doc_freqs = dict(doc_freqs)
+        self.idf = idf
+        self.postings = {word: tuple(sorted(entries)) for word, entries in postings.items()}
+
+    def with_stats(self, idf, avgdl):
+        """Copy sharing this index's documents but scoring with other (e.g. global) statistics"""
+        scorer = copy.copy(self)
+        scorer.idf = idf
+        scorer.avgdl = avgdl
+        scorer.own_stats = False
+        return scorer
+
+    def score(self, query, candidates=None):
+        """Score all documents (or only the candidate ids) against query
+
+        With this index's own statistics, only documents in the query terms' postings are
+        touched; their contributions are summed in query order, so scores match the full scan.
+        """
         query_tokens = self.tokenize(query)
+        if self.own_stats:
+            contributions = {}
+            for position, token in enumerate(query_tokens):
+                for neg_impact, idx in self.postings.get(token, ()):
+                    row = contributions.get(idx)
+                    if row is None:
+                        row = contributions[idx] = [0] * len(query_tokens)
+                    row[position] = -neg_impact
+            ids = range(self.N) if candidates is None else candidates
+            scores = [(idx, sum(contributions[idx]) if idx in contributions else 0) for idx in ids]
+            return sorted(scores, key=lambda x: x[1], reverse=True)
+
         scores = []
 
-        for idx, doc in enumerate(self.corpus):
+        for idx in (range(self.N) if candidates is None else candidates):
+            doc = self.corpus[idx]
             score = 0
             doc_len = self.doc_lengths[idx]
             term_freqs = defaultdict(int)
@@ -154,37 +221,403 @@ class BM25:
 
         return sorted(scores, key=lambda x: x[1], reverse=True)
 
+    def score_until(self, query, deadline, candidates=None):
+        """Score-at-a-time over impact-ordered postings until deadline (a time.perf_counter() value)
 
-# ============ SEARCH FUNCTIONS ============
+        Returns (ranked, completed): matching (idx, score) pairs best first, like score() without
+        zero scores, and the fraction of postings processed. A finished run ranks exactly like score().
+        """
+        query_tokens = self.tokenize(query)
+        slots = defaultdict(list)  # term -> its positions in the query (a repeated token counts twice)
+        for position, token in enumerate(query_tokens):
+            if token in self.postings:
+                slots[token].append(position)
+        total = sum(len(self.postings[term]) for term in slots)
+        allowed = None if candidates is None else set(candidates)
+
+        def stream(term):
+            for neg_impact, idx in self.postings[term]:
+                yield neg_impact, idx, term
+
+        # Contributions are kept per query position and summed in query order, as score() does
+        contributions = {}
+        done = 0
+        for neg_impact, idx, term in heapq.merge(*(stream(term) for term in slots)):
+            if done % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+                break
+            done += 1
+            if allowed is not None and idx not in allowed:
+                continue
+            row = contributions.get(idx)
+            if row is None:
+                row = contributions[idx] = [0] * len(query_tokens)
+            for position in slots[term]:
+                row[position] = -neg_impact
+
+        ranked = sorted(((idx, sum(row)) for idx, row in contributions.items()), key=lambda x: (-x[1], x[0]))
+        return ranked, (done / total if total else 1.0)
+
+
+# ============ INDEX SNAPSHOTS ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
-
-    data = _load_csv(filepath)
+def _build_documents(data, search_cols):
+    """Build one searchable document per row from the search columns"""
+    return [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+
+
+def _file_signature(filepath):
+    """Cheap change marker for a data file"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _filter_value(value):
+    """Normalize a structured column value for bitset lookup"""
+    return str(value or "").strip().lower()
+
+
+def _build_structured(data):
+    """Per FILTER_COLS column: {normalized value: bitset of row ids} and (values, value id per row)"""
+    bitsets, facets = {}, {}
+    for col in FILTER_COLS:
+        if not data or col not in data[0]:
+            continue
+        masks, value_ids, values, ids = {}, {}, [], []
+        for idx, row in enumerate(data):
+            value = _filter_value(row.get(col))
+            masks[value] = masks.get(value, 0) | (1 << idx)
+            if value not in value_ids:
+                value_ids[value] = len(values)
+                values.append(str(row.get(col) or "").strip())
+            ids.append(value_ids[value])
+        bitsets[col] = masks
+        facets[col] = (tuple(values), ids)
+    return bitsets, facets
+
+
+def _bitset_ids(mask):
+    """Row ids set in a bitset, ascending"""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def _normalize_where(where):
+    """Resolve filter column names (case-insensitive) and wrap single values in lists"""
+    columns = {col.lower(): col for col in FILTER_COLS}
+    normalized = {}
+    for col, values in where.items():
+        name = columns.get(str(col).strip().lower())
+        if name is None:
+            raise ValueError(f"Cannot filter on '{col}'. Filterable columns: {', '.join(FILTER_COLS)}")
+        normalized.setdefault(name, []).extend([values] if isinstance(values, str) else values)
+    return normalized
+
+
+def _normalize_facets(facets):
+    """Resolve facet column names (case-insensitive) against FILTER_COLS and 'Stack'"""
+    columns = {col.lower(): col for col in FILTER_COLS + ["Stack"]}
+    if isinstance(facets, str):
+        facets = [f for f in facets.split(",") if f.strip()]
+    normalized = []
+    for col in facets:
+        name = columns.get(str(col).strip().lower())
+        if name is None:
+            raise ValueError(f"Cannot facet on '{col}'. Facet columns: {', '.join(FILTER_COLS)}")
+        if name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+class IndexSnapshot:
+    """Fully built index for one CSV file (or several stacks); never modified after construction"""
+
+    __slots__ = ("filepath", "sources", "search_cols", "signature", "data", "bm25", "bitsets",
+                 "facets", "positions", "stacks", "doc_stacks", "content_key")
+
+    def __init__(self, filepath, sources, search_cols, signature, data, bm25, bitsets, facets, positions,
+                 stacks=None, doc_stacks=None, content_key=None):
+        self.filepath = filepath
+        self.sources = sources          # str paths of every CSV the index was built from
+        self.search_cols = search_cols
+        self.signature = signature
+        self.data = data
+        self.bm25 = bm25
+        self.bitsets = bitsets
+        self.facets = facets            # column -> (display values, value id per row)
+        self.positions = positions      # column -> token -> packed row/offsets (see snippets.py)
+        self.stacks = stacks            # combined stack index: stack names
+        self.doc_stacks = doc_stacks    # combined stack index: position in stacks per row
+        self.content_key = content_key  # index_cache key of the parts
+
+    def filter_ids(self, where):
+        """Row ids matching every column of a normalized where (values OR'ed per column)"""
+        mask = (1 << len(self.data)) - 1
+        for col, values in where.items():
+            if col not in self.bitsets:
+                raise ValueError(f"Column '{col}' is not in {self.filepath.name}")
+            col_mask = 0
+            for value in values:
+                col_mask |= self.bitsets[col].get(_filter_value(value), 0)
+            mask &= col_mask
+        return _bitset_ids(mask)
+
+    def count_facets(self, ranked, columns):
+        """Count facet values over every row with score > 0 in a score-descending ranking"""
+        tables = []
+        for col in columns:
+            if col not in self.facets:
+                raise ValueError(f"Column '{col}' is not in {self.filepath.name}")
+            values, ids = self.facets[col]
+            tables.append((col, values, ids, [0] * len(values)))
+        for idx, score in ranked:
+            if score <= 0:
+                break
+            for _, _, ids, counts in tables:
+                counts[ids[idx]] += 1
+        return {col: _facet_dict(values, counts) for col, values, _, counts in tables}
+
+    def snippets(self, ids, results, query, length):
+        """Per result, query-aware windows of its fields longer than length chars"""
+        query_tokens = BM25().tokenize(query)
+        return [
+            {col: snippet(value, self.positions, idx, col, query_tokens, length)
+             for col, value in result.items() if isinstance(value, str) and len(value) > length}
+            for idx, result in zip(ids, results)
+        ]
+
+
+def _facet_dict(values, counts):
+    """{value: count} for non-empty values that matched, most frequent first"""
+    pairs = [(values[i], c) for i, c in enumerate(counts) if c and values[i]]
+    return dict(sorted(pairs, key=lambda pair: -pair[1]))
+
+
+# Warm indexes: (sources, search cols, shards) -> IndexSnapshot. Readers only do a
+# dict lookup; writers replace whole entries, so a query never sees a half-built index.
+_INDEXES = {}
+_BUILD_LOCK = threading.Lock()  # taken only to build; lookups never lock
+
+# Set while watcher.py keeps _INDEXES fresh; otherwise get_index checks mtimes itself
+_INDEXES_WATCHED = False
+
+
+def _build_parts(data, search_cols, fit=True, stacks=None, doc_stacks=None):
+    """Index parts cached by index_cache: (StoredRows, BM25 or None, bitsets, facets, doc_stacks, positions)"""
+    bm25 = None
+    if fit:
+        bm25 = BM25()
+        bm25.fit(_build_documents(data, search_cols))
+    bitsets, facets = _build_structured(data)
+    if stacks:
+        facets["Stack"] = (tuple(stacks), doc_stacks)
+    return (StoredRows(data), bm25, bitsets, facets, doc_stacks, build_positions(data))
+
+
+def build_index(filepath, search_cols, shards=1):
+    """Build a new snapshot (sharded datasets are fitted by the shard workers)
+
+    Index parts are content-addressed (see index_cache.py), so identical CSVs in
+    other installs or earlier runs are loaded instead of re-fitted.
+    """
+    signature = _file_signature(filepath)
+    key = index_cache.content_key(filepath.read_bytes(), tuple(search_cols), shards > 1)
+    parts = index_cache.load(key)
+    if parts is None:
+        parts = _build_parts(_load_csv(filepath), search_cols, fit=shards <= 1)
+        index_cache.store(key, parts)
+    data, bm25, bitsets, facets, _, positions = parts
+    return IndexSnapshot(filepath, (str(filepath),), tuple(search_cols), signature, data, bm25, bitsets, facets,
+                         positions, content_key=key)
+
+
+def build_stack_index(stacks):
+    """Build one snapshot over several stacks, remembering each row's stack"""
+    filepaths = [DATA_DIR / STACK_CONFIG[stack]["file"] for stack in stacks]
+    search_cols = tuple(_STACK_COLS["search_cols"])
+    signature = tuple(_file_signature(p) for p in filepaths)
+    key = index_cache.content_key(b"\0".join(p.read_bytes() for p in filepaths), search_cols, tuple(stacks))
+    parts = index_cache.load(key)
+    if parts is None:
+        data, doc_stacks = [], []
+        for position, filepath in enumerate(filepaths):
+            rows = _load_csv(filepath)
+            data.extend(rows)
+            doc_stacks.extend([position] * len(rows))
+        parts = _build_parts(data, search_cols, stacks=stacks, doc_stacks=doc_stacks)
+        index_cache.store(key, parts)
+    data, bm25, bitsets, facets, doc_stacks, positions = parts
+    return IndexSnapshot(DATA_DIR / "stacks", tuple(str(p) for p in filepaths), search_cols, signature,
+                         data, bm25, bitsets, facets, positions, tuple(stacks), doc_stacks, key)
+
+
+def get_index(filepath, search_cols, shards=1):
+    """Return the warm snapshot for a dataset, building it on first use"""
+    key = ((str(filepath),), tuple(search_cols), shards)
+    snapshot = _INDEXES.get(key)
+    if snapshot is None or (not _INDEXES_WATCHED and snapshot.signature != _file_signature(filepath)):
+        with _BUILD_LOCK:
+            # Another thread may have built it while this one waited
+            snapshot = _INDEXES.get(key)
+            if snapshot is None or snapshot.signature != _file_signature(filepath):
+                stale = snapshot
+                snapshot = build_index(filepath, search_cols, shards)
+                _INDEXES[key] = snapshot
+                if stale is not None:
+                    _release_unused_parts()
+    return snapshot
+
+
+def get_stack_index(stacks):
+    """Return the warm combined snapshot for a list of stacks"""
+    filepaths = [DATA_DIR / STACK_CONFIG[stack]["file"] for stack in stacks]
+    key = (tuple(str(p) for p in filepaths), tuple(_STACK_COLS["search_cols"]), 1)
+    snapshot = _INDEXES.get(key)
+    if snapshot is None or (not _INDEXES_WATCHED
+                            and snapshot.signature != tuple(_file_signature(p) for p in filepaths)):
+        with _BUILD_LOCK:
+            snapshot = _INDEXES.get(key)
+            if snapshot is None or snapshot.signature != tuple(_file_signature(p) for p in filepaths):
+                stale = snapshot
+                snapshot = build_stack_index(stacks)
+                _INDEXES[key] = snapshot
+                if stale is not None:
+                    _release_unused_parts()
+    return snapshot
+
+
+def _release_unused_parts():
+    """Let index_cache forget parts no warm snapshot uses any more (caller holds _BUILD_LOCK)"""
+    index_cache.retain({snapshot.content_key for snapshot in _INDEXES.values()})
+
+
+def reload_indexes(filepath):
+    """Rebuild every warm index built from a changed file and swap each in atomically"""
+    reloaded = []
+    with _BUILD_LOCK:
+        try:
+            for key, snapshot in list(_INDEXES.items()):
+                if str(filepath) not in snapshot.sources:
+                    continue
+                if not all(Path(source).exists() for source in snapshot.sources):
+                    _INDEXES.pop(key, None)
+                elif snapshot.stacks:
+                    _INDEXES[key] = build_stack_index(snapshot.stacks)
+                else:
+                    _INDEXES[key] = build_index(filepath, snapshot.search_cols, key[2])
+                reloaded.append(key)
+        finally:
+            # Also after a failed rebuild, for the snapshots already swapped
+            if reloaded:
+                _release_unused_parts()
+    return reloaded
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+# ============ SEARCH FUNCTIONS ============
+def _output_row(data, idx, output_cols):
+    """Project a stored row onto a dataset's output columns (only those are decompressed)"""
+    return data.row(idx, output_cols)
+
+
+def _ranked_ids(snapshot, query, candidates, where, shards=1):
+    """Every matching row id in rank order, cached (see cursors.py) for paging without rescoring"""
+    key = cursors.ranking_key(snapshot.sources, snapshot.signature, snapshot.search_cols, query, where)
+    ids = cursors.load_ranking(key)
+    if ids is None:
+        if shards > 1:
+            from shards import search_sharded
+            ranked, _, _ = search_sharded(snapshot, query, len(snapshot.data), shards, candidates)
+        else:
+            ranked = snapshot.bm25.score(query, candidates)
+        ids = [idx for idx, score in ranked if score > 0]
+        cursors.store_ranking(key, ids)
+    return ids
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, engine=None, shards=1, where=None,
+                facets=None, offset=0, paginate=False, deadline=None, snippet_chars=None):
+    """Core search function using BM25
+
+    Returns (results, facet counts or None, total or None, completed, snippets or None).
+    where/facets must already be normalized by _normalize_where/_normalize_facets.
+    With paginate, results start at offset in the cached full ranking and total is its length.
+    With deadline (a time.perf_counter() value), scoring stops there; completed is the fraction done.
+    With snippet_chars, snippets holds query-aware windows of each result's longer fields.
+    """
+    if not filepath.exists():
+        return [], None, None, 1.0, None
+
+    if deadline is not None and paginate:
+        raise ValueError("Cursor pagination cannot be combined with a deadline")
+
+    if (engine or SEARCH_ENGINE) == "fts5":
+        if paginate:
+            raise ValueError("Cursor pagination needs the bm25 engine")
+        if deadline is not None:
+            raise ValueError("Deadlines need the bm25 engine")
+        from fts5 import search_fts5, count_facets_fts5
+        results = search_fts5(filepath, search_cols, output_cols, query, max_results, where)
+        facet_counts = count_facets_fts5(filepath, search_cols, query, where, facets) if facets else None
+        return results, facet_counts, None, 1.0, None
+
+    # Hold one snapshot for the whole query; a concurrent reload swaps in a new one
+    snapshot = get_index(filepath, search_cols, shards)
+    data = snapshot.data
+
+    # Structured filters narrow the candidates before any document is scored
+    candidates = None
+    if where:
+        candidates = snapshot.filter_ids(where)
+        if not candidates:
+            return ([], ({col: {} for col in facets} if facets else None), (0 if paginate else None), 1.0,
+                    [] if snippet_chars else None)
+
+    if paginate:
+        ids = _ranked_ids(snapshot, query, candidates, where, shards)
+        facet_counts = snapshot.count_facets(((idx, 1) for idx in ids), facets) if facets else None
+        page = ids[offset:offset + max_results]
+        results = [_output_row(data, idx, output_cols) for idx in page]
+        snippets = snapshot.snippets(page, results, query, snippet_chars) if snippet_chars else None
+        return results, facet_counts, len(ids), 1.0, snippets
+
+    facet_counts = None
+    completed = 1.0
+    if shards > 1:
+        # Scatter-gather across worker processes (see shards.py)
+        from shards import search_sharded
+        ranked, facet_counts, completed = search_sharded(snapshot, query, max_results, shards, candidates, facets,
+                                                         deadline)
+    else:
+        if deadline is None:
+            ranked = snapshot.bm25.score(query, candidates)
+        else:
+            ranked, completed = snapshot.bm25.score_until(query, deadline, candidates)
+        if facets:
+            facet_counts = snapshot.count_facets(ranked, facets)
 
     # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    ids = [idx for idx, score in ranked[:max_results] if score > 0]
+    results = [_output_row(data, idx, output_cols) for idx in ids]
+    snippets = snapshot.snippets(ids, results, query, snippet_chars) if snippet_chars else None
+
+    return results, facet_counts, None, completed, snippets
+
 
-    return results
+def _add_page_info(response, request, offset, max_results, total):
+    """Attach offset/total and, if more results remain, an opaque next_cursor"""
+    response["offset"] = offset
+    response["total"] = total
+    if offset + max_results < total:
+        response["next_cursor"] = cursors.encode_cursor(request, offset + max_results)
+    return response
 
 
 def detect_domain(query):
@@ -209,8 +642,20 @@ def detect_domain(query):
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def search(query, domain=None, max_results=MAX_RESULTS, engine=None, where=None, facets=None,
+           paginate=False, offset=0, deadline_ms=None, snippet_chars=None):
+    """Main search function with auto-domain detection
+
+    where: optional structured filters, e.g. {"Severity": "High", "Platform": ["Web", "All"]}
+    facets: optional columns (e.g. ["Category"]) to count over every matching row
+    paginate: also return total and a next_cursor for search_page (offset: first result)
+    deadline_ms: return the best results found within this budget, flagged "partial" with "completed"
+    snippet_chars: add "snippets", query-aware windows of fields longer than this (bm25 only)
+    """
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000
+    if engine is not None and engine not in AVAILABLE_ENGINES:
+        return {"error": f"Unknown engine: {engine}. Available: {', '.join(AVAILABLE_ENGINES)}"}
+
     if domain is None:
         domain = detect_domain(query)
 
@@ -220,30 +665,130 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    try:
+        where = _normalize_where(where) if where else None
+        facets = _normalize_facets(facets) if facets else None
+        results, facet_counts, total, completed, snippets = _search_csv(
+            filepath, config["search_cols"], config["output_cols"], query, max_results, engine,
+            config.get("shards", 1), where, facets, offset, paginate or offset > 0, deadline, snippet_chars)
+    except (RuntimeError, ValueError) as e:
+        return {"error": str(e), "domain": domain}
 
-    return {
+    response = {
         "domain": domain,
         "query": query,
         "file": config["file"],
         "count": len(results),
         "results": results
     }
-
-
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
-    if stack not in STACK_CONFIG:
-        return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+    if where:
+        response["filters"] = where
+    if facets:
+        response["facets"] = facet_counts
+    if snippets is not None:
+        response["snippets"] = snippets
+    if total is not None:
+        request = {"kind": "search", "query": query, "domain": domain, "max_results": max_results,
+                   "engine": engine, "where": where, "snippet_chars": snippet_chars}
+        _add_page_info(response, request, offset, max_results, total)
+    if deadline is not None:
+        response["partial"] = completed < 1.0
+        response["completed"] = round(completed, 3)
+    return response
+
+
+def _resolve_stacks(stack):
+    """Accept a stack name, a comma-separated string, a list of stacks, or 'all'"""
+    if isinstance(stack, str):
+        stacks = AVAILABLE_STACKS if stack.strip() == "all" else [s.strip() for s in stack.split(",") if s.strip()]
+    else:
+        stacks = list(stack)
+    stacks = list(dict.fromkeys(stacks))
+    unknown = [s for s in stacks if s not in STACK_CONFIG]
+    if unknown or not stacks:
+        raise ValueError(f"Unknown stack: {', '.join(unknown) or stack}. Available: {', '.join(AVAILABLE_STACKS)}")
+    return stacks
+
+
+def _search_stacks(stacks, query, max_results, where=None, per_stack=None, facets=None, offset=0, paginate=False,
+                   snippet_chars=None):
+    """Score several stacks in one pass over a combined index; merge with optional per-stack quotas
+
+    Returns (results, facet counts or None, total or None, snippets or None) like _search_csv.
+    """
+    snapshot = get_stack_index(stacks)
+
+    candidates = None
+    if where:
+        candidates = snapshot.filter_ids(where)
+        if not candidates:
+            return ([], ({col: {} for col in facets} if facets else None), (0 if paginate else None),
+                    [] if snippet_chars else None)
+
+    if paginate:
+        ranked = [(idx, 1) for idx in _ranked_ids(snapshot, query, candidates, where)]
+    else:
+        ranked = snapshot.bm25.score(query, candidates)
+    facet_counts = snapshot.count_facets(ranked, facets) if facets else None
+
+    # Apply per-stack quotas in rank order; stop early unless the full ranking is needed
+    end = None if paginate else max_results
+    ids = []
+    taken = [0] * len(stacks)
+    for idx, score in ranked:
+        if score <= 0 or (end is not None and len(ids) >= end):
+            break
+        position = snapshot.doc_stacks[idx]
+        if per_stack is not None and taken[position] >= per_stack:
+            continue
+        taken[position] += 1
+        ids.append(idx)
+
+    page = ids[offset:offset + max_results] if paginate else ids
+    results = []
+    for idx in page:
+        result = {"Stack": stacks[snapshot.doc_stacks[idx]]}
+        result.update(_output_row(snapshot.data, idx, _STACK_COLS["output_cols"]))
+        results.append(result)
+    snippets = snapshot.snippets(page, results, query, snippet_chars) if snippet_chars else None
+    return results, facet_counts, (len(ids) if paginate else None), snippets
+
+
+def search_stack(query, stack, max_results=MAX_RESULTS, engine=None, where=None, per_stack=None, facets=None,
+                 paginate=False, offset=0, snippet_chars=None):
+    """Search stack-specific guidelines (where/facets/paginate/offset/snippet_chars: same as search)
+
+    stack may be one stack, a list or comma-separated string of stacks, or "all";
+    several stacks are ranked together and per_stack caps results from each one.
+    """
+    if engine is not None and engine not in AVAILABLE_ENGINES:
+        return {"error": f"Unknown engine: {engine}. Available: {', '.join(AVAILABLE_ENGINES)}"}
+
+    try:
+        stacks = _resolve_stacks(stack)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    if len(stacks) > 1:
+        return _search_multi_stack(query, stacks, max_results, engine, where, per_stack, facets, paginate, offset,
+                                   snippet_chars)
+    stack = stacks[0]
 
     filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
 
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    try:
+        where = _normalize_where(where) if where else None
+        facets = _normalize_facets(facets) if facets else None
+        results, facet_counts, total, _, snippets = _search_csv(
+            filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, engine,
+            STACK_CONFIG[stack].get("shards", 1), where, facets, offset, paginate or offset > 0, None, snippet_chars)
+    except (RuntimeError, ValueError) as e:
+        return {"error": str(e), "stack": stack}
 
-    return {
+    response = {
         "domain": "stack",
         "stack": stack,
         "query": query,
@@ -251,3 +796,172 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+    if where:
+        response["filters"] = where
+    if facets:
+        response["facets"] = facet_counts
+    if snippets is not None:
+        response["snippets"] = snippets
+    if total is not None:
+        request = {"kind": "stack", "query": query, "stack": stack, "max_results": max_results,
+                   "engine": engine, "where": where, "snippet_chars": snippet_chars}
+        _add_page_info(response, request, offset, max_results, total)
+    return response
+
+
+def _search_multi_stack(query, stacks, max_results, engine, where, per_stack, facets, paginate, offset,
+                        snippet_chars):
+    """search_stack for several stacks at once"""
+    missing = [s for s in stacks if not (DATA_DIR / STACK_CONFIG[s]["file"]).exists()]
+    if missing:
+        return {"error": f"Stack file not found: {', '.join(missing)}", "stack": ", ".join(stacks)}
+    if (engine or SEARCH_ENGINE) != "bm25":
+        return {"error": "Multi-stack search needs the bm25 engine", "stack": ", ".join(stacks)}
+
+    try:
+        where = _normalize_where(where) if where else None
+        facets = _normalize_facets(facets) if facets else None
+        results, facet_counts, total, snippets = _search_stacks(stacks, query, max_results, where, per_stack, facets,
+                                                                offset, paginate or offset > 0, snippet_chars)
+    except ValueError as e:
+        return {"error": str(e), "stack": ", ".join(stacks)}
+
+    response = {
+        "domain": "stack",
+        "stack": ", ".join(stacks),
+        "stacks": stacks,
+        "query": query,
+        "file": ", ".join(STACK_CONFIG[s]["file"] for s in stacks),
+        "count": len(results),
+        "results": results
+    }
+    if where:
+        response["filters"] = where
+    if facets:
+        response["facets"] = facet_counts
+    if snippets is not None:
+        response["snippets"] = snippets
+    if total is not None:
+        request = {"kind": "stack", "query": query, "stack": stacks, "max_results": max_results,
+                   "engine": engine, "where": where, "per_stack": per_stack, "snippet_chars": snippet_chars}
+        _add_page_info(response, request, offset, max_results, total)
+    return response
+
+
+def search_page(cursor):
+    """Fetch the page a next_cursor points to, reusing the cached ranking when possible"""
+    try:
+        request, offset = cursors.decode_cursor(cursor)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    if request.get("kind") == "stack":
+        return search_stack(request["query"], request["stack"], request["max_results"], request.get("engine"),
+                            request.get("where"), request.get("per_stack"), paginate=True, offset=offset,
+                            snippet_chars=request.get("snippet_chars"))
+    return search(request["query"], request.get("domain"), request["max_results"], request.get("engine"),
+                  request.get("where"), paginate=True, offset=offset, snippet_chars=request.get("snippet_chars"))
+
+
+# ============ REQUEST CONTEXT ============
+class SearchContext:
+    """Request-scoped memo for searches whose queries share words
+
+    A design system and its page overrides search overlapping queries, e.g. "saas dashboard"
+    and "dashboard saas dashboard". BM25 sums each query term's per-row contribution in query
+    order, so the context keeps every tokenized query and every (domain, term) contribution
+    vector it has used, and ranks a new query by summing cached vectors: results match search()
+    exactly. Each domain's snapshot is pinned on first use, so a request sees one index version.
+    Searches outside this shortcut (other engines, sharded datasets, filters, deadlines, ...)
+    are passed to search(). Concurrent use is safe; a race only repeats work.
+    """
+
+    def __init__(self):
+        self._tokenize = BM25().tokenize
+        self._tokens = {}     # query -> tokens
+        self._snapshots = {}  # domain -> snapshot
+        self._vectors = {}    # (domain, term) -> {row id: contribution}
+        self._rankings = {}   # (domain, tokens) -> matching row ids, best first
+
+    def tokenize(self, query):
+        """BM25 tokens of query, tokenized once per request"""
+        tokens = self._tokens.get(query)
+        if tokens is None:
+            tokens = self._tokens[query] = tuple(self._tokenize(query))
+        return tokens
+
+    def _snapshot(self, domain):
+        snapshot = self._snapshots.get(domain)
+        if snapshot is None:
+            config = CSV_CONFIG[domain]
+            snapshot = self._snapshots[domain] = get_index(DATA_DIR / config["file"], config["search_cols"])
+        return snapshot
+
+    def _vector(self, domain, snapshot, term):
+        vector = self._vectors.get((domain, term))
+        if vector is None:
+            vector = self._vectors[(domain, term)] = {idx: -neg_impact
+                                                      for neg_impact, idx in snapshot.bm25.postings.get(term, ())}
+        return vector
+
+    def _ranking(self, domain, snapshot, tokens):
+        ids = self._rankings.get((domain, tokens))
+        if ids is None:
+            vectors = [self._vector(domain, snapshot, term) for term in tokens]
+            # Summed in query order with 0 for absent terms, as BM25.score() does
+            scores = {idx: sum(vector.get(idx, 0) for vector in vectors) for idx in set().union(*vectors)}
+            ids = self._rankings[(domain, tokens)] = [
+                idx for idx, score in sorted(scores.items(), key=lambda x: (-x[1], x[0])) if score > 0]
+        return ids
+
+    def search(self, query, domain=None, max_results=MAX_RESULTS, **options):
+        """search() for this request, reusing the tokens and term vectors of earlier queries"""
+        if domain is None:
+            domain = detect_domain(query)
+        config = CSV_CONFIG.get(domain)
+        if (options or config is None or config.get("shards", 1) > 1 or SEARCH_ENGINE != "bm25"
+                or not (DATA_DIR / config["file"]).exists()):
+            return search(query, domain, max_results, **options)
+
+        snapshot = self._snapshot(domain)
+        ids = self._ranking(domain, snapshot, self.tokenize(query))[:max_results]
+        results = [_output_row(snapshot.data, idx, config["output_cols"]) for idx in ids]
+        return {
+            "domain": domain,
+            "query": query,
+            "file": config["file"],
+            "count": len(results),
+            "results": results
+        }
+
+
+# ============ BATCH SEARCH ============
+# Threads for search_batch (None = one per CPU). Queries only read immutable snapshots,
+# so on a free-threaded CPython (3.13t+) the threads score truly in parallel.
+BATCH_WORKERS = None
+
+
+def _run_request(request, options):
+    """Dispatch one search_batch request"""
+    if isinstance(request, str):
+        return search(request, **options)
+    kwargs = {**options, **request}
+    if "stack" in kwargs:
+        return search_stack(**kwargs)
+    return search(**kwargs)
+
+
+def search_batch(requests, max_workers=None, **options):
+    """Run many searches on a thread pool and return their responses in order
+
+    requests: query strings, or dicts of search() arguments (a "stack" key means search_stack)
+    options: defaults for every request, e.g. max_results=5
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    requests = list(requests)
+    workers = max(1, min(len(requests), max_workers or BATCH_WORKERS or os.cpu_count() or 1))
+    if workers == 1:
+        return [_run_request(request, options) for request in requests]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-batch") as pool:
+        return list(pool.map(lambda request: _run_request(request, options), requests))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Design Pool - generate many design systems in parallel
+
+On Python 3.14+ generations run in subinterpreters (InterpreterPoolExecutor):
+each has its own GIL and keeps its own warm indexes, with no process startup
+or result pickling across processes. Older interpreters fall back to a process
+pool whose workers are warmed the same way.
+
+Usage:
+    from design_pool import generate_many
+    outputs = generate_many(["SaaS dashboard", ("beauty spa", "Serenity Spa")], output_format="markdown")
+"""
+
+import atexit
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:  # Python < 3.14
+    InterpreterPoolExecutor = None
+
+# ============ CONFIGURATION ============
+# "auto" uses subinterpreters when available, else processes
+POOL_MODE = "auto"
+AVAILABLE_MODES = ["auto", "interpreters", "processes"]
+POOL_WORKERS = None  # None = one per CPU
+
+_SCRIPTS_DIR = str(Path(__file__).resolve().parent)
+# Subinterpreters start without this directory on sys.path, so the initializer is plain
+# source run by the builtin exec: it must work before this module can be imported there.
+_BOOTSTRAP = (
+    "import sys\n"
+    f"if {_SCRIPTS_DIR!r} not in sys.path:\n"
+    f"    sys.path.insert(0, {_SCRIPTS_DIR!r})\n"
+    "import design_pool\n"
+    "design_pool._warm()\n"
+)
+
+_pools = {}  # mode -> (executor, workers)
+_pools_lock = threading.Lock()
+
+
+# ============ WORKER SIDE ============
+def _warm():
+    """Build this worker's indexes for every domain the generator searches"""
+    from core import CSV_CONFIG, DATA_DIR, get_index
+    from design_system import SEARCH_CONFIG
+    for domain in SEARCH_CONFIG:
+        config = CSV_CONFIG[domain]
+        get_index(DATA_DIR / config["file"], config["search_cols"], config.get("shards", 1))
+
+
+def _generate(job):
+    """Run one generate_design_system call from keyword arguments"""
+    from design_system import generate_design_system
+    return generate_design_system(**job)
+
+
+def _ping():
+    return os.getpid()
+
+
+# ============ COORDINATOR ============
+def resolve_mode(mode=None):
+    """The pool kind a mode maps to on this interpreter"""
+    mode = mode or POOL_MODE
+    if mode not in AVAILABLE_MODES:
+        raise ValueError(f"Unknown pool mode: {mode}. Available: {', '.join(AVAILABLE_MODES)}")
+    if mode == "auto":
+        return "interpreters" if InterpreterPoolExecutor is not None else "processes"
+    if mode == "interpreters" and InterpreterPoolExecutor is None:
+        raise RuntimeError(f"Subinterpreter pools need Python 3.14+ (running {sys.version.split()[0]})")
+    return mode
+
+
+def _start_pool(mode, workers):
+    if mode == "interpreters":
+        return InterpreterPoolExecutor(max_workers=workers, initializer=exec, initargs=(_BOOTSTRAP, {}))
+    return ProcessPoolExecutor(max_workers=workers, initializer=_warm)
+
+
+def get_pool(mode=None, max_workers=None):
+    """Return the shared warm pool for a mode, falling back to processes if subinterpreters fail"""
+    mode = resolve_mode(mode)
+    workers = max_workers or POOL_WORKERS or os.cpu_count() or 1
+    with _pools_lock:
+        if mode in _pools and _pools[mode][1] >= workers:
+            return _pools[mode][0], mode
+        if mode in _pools:
+            _pools.pop(mode)[0].shutdown(wait=False)
+        pool = _start_pool(mode, workers)
+        if mode == "interpreters":
+            try:
+                pool.submit(_ping).result()
+            except Exception as e:
+                # e.g. an extension module that cannot load in a subinterpreter
+                pool.shutdown(wait=False, cancel_futures=True)
+                print(f"design_pool: subinterpreters unavailable ({e}); using processes", file=sys.stderr)
+                mode = "processes"
+                pool = _start_pool(mode, workers)
+        _pools[mode] = (pool, workers)
+        return pool, mode
+
+
+def shutdown_pools():
+    """Stop every worker pool"""
+    with _pools_lock:
+        pools = [pool for pool, _ in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pools)
+
+
+def _job_kwargs(job, output_format):
+    """Normalize a job (query, (query, project_name) or generate_design_system kwargs)"""
+    if isinstance(job, str):
+        return {"query": job, "output_format": output_format}
+    if isinstance(job, (tuple, list)):
+        return {"query": job[0], "project_name": job[1] if len(job) > 1 else None, "output_format": output_format}
+    return {"output_format": output_format, **job}
+
+
+def generate_many(jobs, output_format="ascii", mode=None, max_workers=None):
+    """Generate design systems for many jobs in parallel; returns the formatted outputs in order"""
+    jobs = [_job_kwargs(job, output_format) for job in jobs]
+    if not jobs:
+        return []
+    pool, _ = get_pool(mode, max_workers)
+    return list(pool.map(_generate, jobs))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max FTS5 - SQLite FTS5 search backend for UI/UX style guides
+
+Alternative to the in-process BM25 class for large corpora. Each CSV dataset is
+loaded once into an FTS5 virtual table over its search columns and ranked with
+FTS5's built-in bm25() using per-column weights.
+
+Usage:
+    from core import search
+    result = search("glassmorphism dark", "style", engine="fts5")
+"""
+
+import csv
+import hashlib
+import json
+import sqlite3
+import threading
+
+from core import BM25
+
+# ============ CONFIGURATION ============
+# None keeps the database in memory; set a file path to reuse tables across runs
+FTS5_DB_PATH = None
+
+# bm25() weight per search column (columns not listed weigh 1.0)
+FTS5_COLUMN_WEIGHTS = {
+    "Style Category": 2.0,
+    "Product Type": 2.0,
+    "Pattern Name": 2.0,
+    "Font Pairing Name": 2.0,
+    "Icon Name": 2.0,
+    "Data Type": 2.0,
+    "Keywords": 1.5,
+    "Issue": 1.5,
+    "Guideline": 1.5,
+}
+
+# Keep "_" inside tokens so identifiers match the way BM25.tokenize splits them
+_TOKENIZER = "unicode61 tokenchars '_'"
+
+_conn = None
+_lock = threading.Lock()
+
+
+# ============ DATABASE ============
+def _connect():
+    """Open (once) the shared FTS5 database"""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(FTS5_DB_PATH or ":memory:", check_same_thread=False)
+        try:
+            conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+            conn.execute("DROP TABLE temp._fts5_probe")
+        except sqlite3.OperationalError:
+            conn.close()
+            raise RuntimeError(f"SQLite {sqlite3.sqlite_version} was built without FTS5; use --engine bm25")
+        conn.execute("CREATE TABLE IF NOT EXISTS fts5_meta (name TEXT PRIMARY KEY, signature TEXT)")
+        _conn = conn
+    return _conn
+
+
+def _table_for(conn, filepath, search_cols):
+    """Return the FTS5 table for a dataset, (re)loading it if the CSV changed"""
+    key = f"{filepath.resolve()}|{'|'.join(search_cols)}"
+    name = "fts_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    stat = filepath.stat()
+    signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    row = conn.execute("SELECT signature FROM fts5_meta WHERE name = ?", (name,)).fetchone()
+    if row and row[0] == signature:
+        return name
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = list(csv.DictReader(f))
+
+    cols = ", ".join(f"c{i}" for i in range(len(search_cols)))
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+        conn.execute(f"CREATE VIRTUAL TABLE {name} USING fts5({cols}, row UNINDEXED, tokenize=\"{_TOKENIZER}\")")
+        conn.executemany(
+            f"INSERT INTO {name} (rowid, {cols}, row) VALUES ({', '.join('?' * (len(search_cols) + 2))})",
+            [
+                (idx, *(str(r.get(col, "") or "") for col in search_cols), json.dumps(r, ensure_ascii=False))
+                for idx, r in enumerate(data)
+            ]
+        )
+        conn.execute("INSERT OR REPLACE INTO fts5_meta (name, signature) VALUES (?, ?)", (name, signature))
+    return name
+
+
+def _match_expression(query):
+    """Build an OR query from the same tokens the BM25 engine would score"""
+    tokens = list(dict.fromkeys(BM25().tokenize(query)))
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in tokens)
+
+
+# ============ SEARCH ============
+def _where_clause(where):
+    """SQL conditions and parameters for normalized structured filters"""
+    conditions, params = "", []
+    for col, values in (where or {}).items():
+        conditions += f" AND lower(trim(json_extract(row, ?))) IN ({', '.join('?' * len(values))})"
+        params += [f'$."{col}"'] + [str(v).strip().lower() for v in values]
+    return conditions, params
+
+
+def search_fts5(filepath, search_cols, output_cols, query, max_results, where=None):
+    """FTS5 counterpart of core._search_csv, returning the same row dicts
+
+    where: normalized structured filters ({column: [values]}), matched case-insensitively
+    """
+    match = _match_expression(query)
+    if not match:
+        return []
+
+    weights = ", ".join(str(FTS5_COLUMN_WEIGHTS.get(col, 1.0)) for col in search_cols)
+    conditions, params = _where_clause(where)
+
+    with _lock:
+        conn = _connect()
+        name = _table_for(conn, filepath, search_cols)
+        rows = conn.execute(
+            f"SELECT row FROM {name} WHERE {name} MATCH ?{conditions} "
+            f"ORDER BY bm25({name}, {weights}, 0.0), rowid LIMIT ?",
+            (match, *params, max_results)
+        ).fetchall()
+
+    results = []
+    for (raw,) in rows:
+        row = json.loads(raw)
+        results.append({col: row.get(col, "") for col in output_cols if col in row})
+    return results
+
+
+def count_facets_fts5(filepath, search_cols, query, where, facets):
+    """Facet counts over every FTS5 match (same shape as IndexSnapshot.count_facets)"""
+    counts = {col: {} for col in facets}
+    match = _match_expression(query)
+    if not match:
+        return counts
+
+    conditions, params = _where_clause(where)
+    with _lock:
+        conn = _connect()
+        name = _table_for(conn, filepath, search_cols)
+        for col in facets:
+            rows = conn.execute(
+                f"SELECT min(trim(json_extract(row, ?))) AS value, count(*) AS n FROM {name} "
+                f"WHERE {name} MATCH ?{conditions} GROUP BY lower(trim(json_extract(row, ?))) ORDER BY n DESC",
+                (f'$."{col}"', match, *params, f'$."{col}"')
+            ).fetchall()
+            counts[col] = {value: n for value, n in rows if value}
+    return counts
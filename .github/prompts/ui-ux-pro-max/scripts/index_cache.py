@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Index Cache - content-addressed index artifacts shared across installs
+
+The skill ships (and agents install) byte-identical copies of data/ in several
+places. Built indexes are stored once in a user-level cache directory, keyed by
+the SHA-256 of the source CSV bytes plus the index layout, so every install with
+identical data reuses the same artifact. Within one process, identical content
+also shares the same in-memory objects.
+
+Cache location: $UIPRO_CACHE_DIR, else $XDG_CACHE_HOME/ui-ux-pro-max,
+else ~/.cache/ui-ux-pro-max (%LOCALAPPDATA%\\ui-ux-pro-max on Windows).
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+# ============ CONFIGURATION ============
+# Bump whenever the pickled index layout changes so stale artifacts are ignored
+INDEX_FORMAT_VERSION = 8
+INDEX_CACHE_ENABLED = True
+
+_shared = {}  # content key -> index parts, shared by every install in this process (see retain)
+
+
+def cache_dir():
+    """Resolve the user-level cache directory"""
+    if os.environ.get("UIPRO_CACHE_DIR"):
+        return Path(os.environ["UIPRO_CACHE_DIR"])
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "ui-ux-pro-max"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ui-ux-pro-max"
+
+
+def content_key(raw, *layout):
+    """Hash source bytes together with the format version and index layout"""
+    digest = hashlib.sha256()
+    digest.update(f"v{INDEX_FORMAT_VERSION}|{layout!r}|".encode("utf-8"))
+    digest.update(raw)
+    return digest.hexdigest()
+
+
+def _artifact_path(key):
+    return cache_dir() / "indexes" / f"{key}.pickle"
+
+
+def load(key):
+    """Return cached index parts for a key, or None"""
+    if key in _shared:
+        return _shared[key]
+    if not INDEX_CACHE_ENABLED:
+        return None
+    try:
+        with open(_artifact_path(key), "rb") as f:
+            parts = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        return None
+    _shared[key] = parts
+    return parts
+
+
+def store(key, parts):
+    """Remember index parts in memory and, best effort, on disk (atomic rename)"""
+    _shared[key] = parts
+    if not INDEX_CACHE_ENABLED:
+        return
+    path = _artifact_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(parts, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        # A read-only or full cache directory only costs a rebuild next time
+        pass
+
+
+def retain(keys):
+    """Forget shared in-memory parts whose key is not in keys (the ones still in use)
+
+    Called when snapshots are replaced, so a long-running process with hot reloads keeps
+    only the current version of each index in memory. On-disk artifacts are kept.
+    """
+    for key in list(_shared):
+        if key not in keys:
+            _shared.pop(key, None)
+
+
+def clear_cache():
+    """Delete all on-disk index artifacts and forget shared in-memory ones"""
+    _shared.clear()
+    directory = cache_dir() / "indexes"
+    if directory.is_dir():
+        for path in directory.glob("*.pickle"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Templates - precompiled text skeletons for the formatters
+
+A Template is split once, at import, into its literal chunks and ${slot}
+names. Rendering is a single pass that interleaves the literals with the
+slot values, either joined into one string or streamed to a writer (e.g.
+an open file's write), so the large static parts of a document are never
+rebuilt line by line.
+"""
+
+import re
+
+_SLOT = re.compile(r"\$\{(\w+)\}")
+
+
+class Template:
+    """Text with ${slot} fields, compiled into literal chunks and slot names"""
+
+    def __init__(self, text):
+        pieces = _SLOT.split(text)
+        self.head = pieces[0]
+        self.chunks = tuple(zip(pieces[1::2], pieces[2::2]))  # (slot, literal that follows it)
+        self.slots = frozenset(slot for slot, _ in self.chunks)
+
+    def render(self, values):
+        """Fill every slot from values in one pass"""
+        out = [self.head]
+        for slot, literal in self.chunks:
+            out.append(str(values[slot]))
+            out.append(literal)
+        return "".join(out)
+
+    def stream(self, values, write):
+        """Pass the filled template to write chunk by chunk instead of building one string"""
+        write(self.head)
+        for slot, literal in self.chunks:
+            write(str(values[slot]))
+            write(literal)
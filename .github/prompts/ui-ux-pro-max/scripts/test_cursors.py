@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max cursor checks - malformed cursors are errors, never tracebacks
+Usage: python test_cursors.py   (or: python -m pytest test_cursors.py)
+"""
+
+import base64
+import json
+
+import core
+import cursors
+
+
+def _token(request, offset=3, version=cursors.CURSOR_VERSION):
+    payload = json.dumps({"v": version, "r": request, "o": offset})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+MALFORMED = [
+    [1],
+    "query",
+    None,
+    {},
+    {"query": "a"},
+    {"max_results": 3},
+    {"query": 5, "max_results": 3},
+    {"query": "a", "max_results": "3"},
+    {"query": "a", "max_results": True},
+    {"query": "a", "max_results": 0},
+    {"kind": "other", "query": "a", "max_results": 3},
+    {"kind": "stack", "query": "a", "max_results": 3},
+    {"query": "a", "max_results": 3, "where": "Severity"},
+    {"query": "a", "max_results": 3, "where": {"Severity": 5}},
+    {"query": "a", "max_results": 3, "where": {"Severity": ["High", 5]}},
+    {"query": "a", "max_results": 3, "where": {"Severity": {"High": 1}}},
+    {"kind": "stack", "query": "a", "max_results": 3, "stack": [1, 2]},
+    {"kind": "stack", "query": "a", "max_results": 3, "stack": 7},
+]
+
+
+def test_malformed_cursors_return_errors():
+    for request in MALFORMED:
+        result = core.search_page(_token(request))
+        assert result.get("error", "").startswith("Invalid cursor"), (request, result)
+
+
+def test_bad_envelopes_return_errors():
+    for token in ["", "not base64!", _token({"query": "a", "max_results": 3}, offset=-1),
+                  _token({"query": "a", "max_results": 3}, version=-1)]:
+        assert core.search_page(token).get("error", "").startswith("Invalid cursor"), token
+
+
+def test_issued_cursors_still_page():
+    first = core.search("animation", "ux", 2, paginate=True, where={"Severity": ["High", "Medium"]})
+    second = core.search_page(first["next_cursor"])
+    assert "error" not in second and second["offset"] == 2 and second["filters"] == first["filters"]
+
+    first = core.search_stack("form", ["react", "vue"], 2, paginate=True)
+    second = core.search_page(first["next_cursor"])
+    assert "error" not in second and second["offset"] == 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
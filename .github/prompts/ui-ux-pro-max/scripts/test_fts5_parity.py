@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max FTS5 parity - the fts5 engine must rank like the bm25 engine
+Usage: python test_fts5_parity.py   (or: python -m pytest test_fts5_parity.py)
+
+Runs a fixed query set per domain (and a few stacks) through both engines and
+checks the mean top-k overlap and top-1 agreement, so changes to the column
+weights, the tokenizer or either ranking show up as a failure.
+"""
+
+import core
+import fts5
+
+# ============ CONFIGURATION ============
+TOP_K = 5
+MIN_OVERLAP = 0.8   # mean share of the bm25 top-k that fts5 also returns, per domain
+MIN_TOP1 = 0.75     # share of queries whose best result is the same, per domain
+
+DOMAIN_QUERIES = {
+    "style": ["glassmorphism dark", "minimal clean", "brutalism bold", "neumorphism soft",
+              "retro vintage", "3d immersive", "gradient vibrant", "accessible high contrast"],
+    "color": ["fintech trust blue", "healthcare calm", "luxury gold", "kids playful",
+              "eco green", "saas modern", "restaurant warm", "gaming neon"],
+    "chart": ["trend over time", "comparison categories", "part to whole", "distribution",
+              "correlation", "geographic map", "funnel conversion", "real-time streaming"],
+    "landing": ["saas pricing", "hero video", "testimonial social proof", "lead capture form",
+                "product launch", "waitlist", "app download", "event registration"],
+    "product": ["saas dashboard", "ecommerce luxury", "fintech crypto", "healthcare clinic",
+                "education platform", "portfolio creative", "restaurant booking", "gaming"],
+    "ux": ["animation reduced motion", "touch target size", "keyboard focus", "form validation error",
+           "loading state", "scroll performance", "color contrast", "navigation mobile"],
+    "typography": ["elegant luxury serif", "modern tech sans", "playful friendly", "corporate professional",
+                   "editorial magazine", "minimal clean", "developer monospace", "bold display"],
+    "icons": ["arrow navigation", "settings gear", "user profile", "shopping cart",
+              "notification bell", "search magnify", "social media", "file document"],
+    "react": ["suspense waterfall", "bundle size barrel imports", "rerender memo", "server components",
+              "dynamic import", "useeffect dependencies", "data fetching cache", "list virtualization"],
+    "web": ["aria label", "focus outline", "semantic html", "autocomplete input",
+            "preconnect fonts", "virtualize long list", "form input type", "image alt text"],
+}
+
+STACK_QUERIES = {
+    "html-tailwind": ["responsive layout grid", "dark mode", "form input", "animation transition"],
+    "react": ["form validation state", "list rendering keys", "context provider", "effect cleanup"],
+    "nextjs": ["image optimization", "server components", "routing layout", "metadata seo"],
+}
+
+
+def _require_fts5():
+    try:
+        fts5._connect()
+    except RuntimeError as e:
+        try:
+            import pytest
+        except ImportError:
+            raise SystemExit(f"skipped: {e}")
+        pytest.skip(str(e))
+
+
+def _overlap(run, queries):
+    """(mean top-k overlap, top-1 agreement) of fts5 against bm25 for run(query, engine)"""
+    overlaps, top1 = [], 0
+    for query in queries:
+        bm25 = [tuple(row.items()) for row in run(query, "bm25")["results"]]
+        fts = [tuple(row.items()) for row in run(query, "fts5")["results"]]
+        overlaps.append(len(set(bm25) & set(fts)) / max(len(bm25), len(fts)) if bm25 or fts else 1.0)
+        top1 += bm25[:1] == fts[:1]
+    return sum(overlaps) / len(overlaps), top1 / len(queries)
+
+
+def parity_report():
+    """name -> (mean top-k overlap, top-1 agreement) for every domain and stack"""
+    report = {}
+    for domain, queries in DOMAIN_QUERIES.items():
+        report[domain] = _overlap(lambda q, engine: core.search(q, domain, TOP_K, engine=engine), queries)
+    for stack, queries in STACK_QUERIES.items():
+        report[f"stack:{stack}"] = _overlap(lambda q, engine: core.search_stack(q, stack, TOP_K, engine=engine),
+                                            queries)
+    return report
+
+
+def test_domain_parity():
+    _require_fts5()
+    failures = [f"{name}: overlap {overlap:.2f}, top-1 {top1:.2f}"
+                for name, (overlap, top1) in parity_report().items()
+                if overlap < MIN_OVERLAP or top1 < MIN_TOP1]
+    assert not failures, "fts5 ranks differently from bm25 on " + "; ".join(failures)
+
+
+if __name__ == "__main__":
+    _require_fts5()
+    for name, (overlap, top1) in parity_report().items():
+        print(f"{name:20} top-{TOP_K} overlap {overlap:.2f}  top-1 {top1:.2f}")
+    test_domain_parity()
+    print("ok  test_domain_parity")